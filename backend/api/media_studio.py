@@ -579,11 +579,11 @@ async def generate_video(
             success=result.success,
             video_id=result.video_id,
             video_url=result.video_url,
-            video_data=result.video_data,
+            video_data=result.video_data_b64,
             mime_type=result.mime_type,
             duration=result.duration,
             error=result.error,
-            metadata=result.metadata,
+            metadata=result.metadata or {},
         )
     except Exception as e:
         logger.error(f"Video generation failed: {e}")
@@ -616,11 +616,11 @@ async def video_from_images(
             success=result.success,
             video_id=result.video_id,
             video_url=result.video_url,
-            video_data=result.video_data,
+            video_data=result.video_data_b64,
             mime_type=result.mime_type,
             duration=result.duration,
             error=result.error,
-            metadata=result.metadata,
+            metadata=result.metadata or {},
         )
     except Exception as e:
         logger.error(f"Images to video failed: {e}")
@@ -652,7 +652,7 @@ async def extend_video(
         return VideoResponse(
             success=result.success,
             video_url=result.extended_video_url,
-            video_data=result.extended_video_data,
+            video_data=result.extended_video_data_b64,
             duration=result.total_duration,
             error=result.error,
             metadata={
@@ -692,7 +692,7 @@ async def extend_video_advanced(
         return VideoResponse(
             success=result.success,
             video_url=result.extended_video_url,
-            video_data=result.extended_video_data,
+            video_data=result.extended_video_data_b64,
             duration=result.total_duration,
             error=result.error,
             metadata={
@@ -735,11 +735,11 @@ async def interpolate_frames(
             success=result.success,
             video_id=result.video_id,
             video_url=result.video_url,
-            video_data=result.video_data,
+            video_data=result.video_data_b64,
             mime_type=result.mime_type,
             duration=result.duration,
             error=result.error,
-            metadata=result.metadata,
+            metadata=result.metadata or {},
         )
     except Exception as e:
         logger.error(f"Frame interpolation failed: {e}")
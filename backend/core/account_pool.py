@@ -396,7 +396,11 @@ def get_http_client() -> httpx.AsyncClient:
             verify=False,
             http2=False,
             timeout=httpx.Timeout(Config.TIMEOUT_SECONDS, connect=60.0),
-            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            limits=httpx.Limits(
+                max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=Config.HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
         )
         if Config.PROXY:
             logger.info(f"HTTP client created with proxy: {Config.PROXY}")
@@ -65,6 +65,11 @@ class Config:
     TIMEOUT_SECONDS: int = int(os.getenv("TIMEOUT_SECONDS", "600"))
     JWT_TTL_SECONDS: int = int(os.getenv("JWT_TTL_SECONDS", "270"))
     
+    # HTTP connection pool settings (shared client, long video requests hold connections)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "100"))
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "gemini-ultra-gateway-secret-key-change-me")
     ADMIN_USERNAME: str = os.getenv("ADMIN_USERNAME", "admin")
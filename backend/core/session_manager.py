@@ -5,6 +5,7 @@ Manages Gemini Business API sessions and file uploads
 
 import json
 import time
+import base64
 import uuid
 import logging
 import hashlib
@@ -178,6 +179,18 @@ class SessionManager:
         
         return file_id
     
+    async def upload_file_bytes(
+        self,
+        account: Account,
+        session: Session,
+        mime_type: str,
+        content: bytes,
+    ) -> str:
+        """Upload raw file bytes to the session, returns file_id"""
+        return await self.upload_file(
+            account, session, mime_type, base64.b64encode(content).decode()
+        )
+    
     async def upload_file_by_url(
         self,
         account: Account,
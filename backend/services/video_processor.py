@@ -6,29 +6,137 @@ Supports FFmpeg (if available) or pure Python fallback
 
 import os
 import io
+import json
+import functools
+import math
 import base64
 import logging
+import asyncio
 import tempfile
 import subprocess
 import shutil
-from typing import Optional, List, Tuple, Union
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional, List, Tuple, Union, Callable
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 logger = logging.getLogger("gemini.video_processor")
 
+# Check PyAV availability (in-process decode, avoids one ffmpeg fork per frame).
+# Decoded frames are converted with frame.to_image(), which needs Pillow, so
+# the PyAV path is only enabled when both import
+PYAV_AVAILABLE = False
+try:
+    import av
+    import PIL.Image  # noqa: F401
+    PYAV_AVAILABLE = True
+except ImportError:
+    av = None
+
+# Number of open PyAV containers kept around for repeated frame extraction
+AV_CONTAINER_CACHE_SIZE = 8
+
+# FFmpeg hardware decoders to use, in order of preference
+HWACCEL_PREFERENCE = ("cuda", "videotoolbox", "qsv", "d3d11va", "vaapi", "dxva2")
+
+# Only errors on stderr: no banner, build info or per-frame progress
+FFMPEG_QUIET_ARGS = ("-hide_banner", "-nostats", "-loglevel", "error")
+
+# Output args for extract_first_frame: one JPEG frame piped to stdout, no seek
+FIRST_FRAME_OUTPUT_ARGS = (
+    "-frames:v", "1",
+    "-q:v", "2",
+    "-f", "image2pipe",
+    "-vcodec", "mjpeg",
+    "-",
+)
+
+# extract_last_frame grabs the frame this many seconds before the end,
+# falling back to a fixed timestamp when the duration is unknown
+LAST_FRAME_OFFSET = 0.1
+LAST_FRAME_FALLBACK_TIMESTAMP = 10.0
+
+
+async def to_thread(func, *args):
+    """Run a blocking call in the default executor (asyncio.to_thread needs 3.9)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+
+class _LazyDecode:
+    """Defer decoding subprocess output until a log record is actually formatted"""
+    __slots__ = ("_data",)
+    
+    def __init__(self, data: bytes):
+        self._data = data
+    
+    def __str__(self) -> str:
+        return self._data.decode(errors="replace")
+
 
 @dataclass
 class FrameInfo:
-    """Information about an extracted frame"""
-    frame_number: int
-    timestamp: float
+    """
+    Information about an extracted frame
+    
+    timestamp and frame_number are None when the frame's position is not
+    known, e.g. a frame seeked relative to the end of the video.
+    """
+    frame_number: Optional[int]
+    timestamp: Optional[float]
     data: bytes
     mime_type: str = "image/jpeg"
     width: Optional[int] = None
     height: Optional[int] = None
 
 
+@dataclass
+class FrameBatch:
+    """
+    Frames stored column-wise (struct of arrays) for bulk workflows
+    
+    Metadata lives in compact typed arrays so scans over timestamps or
+    sizes don't touch the frame payloads. Unknown sizes are stored as 0
+    and unknown timestamps as NaN.
+    """
+    timestamps: array = field(default_factory=lambda: array("d"))
+    datas: List[bytes] = field(default_factory=list)
+    widths: array = field(default_factory=lambda: array("i"))
+    heights: array = field(default_factory=lambda: array("i"))
+    mime_type: str = "image/jpeg"
+    
+    def __len__(self) -> int:
+        return len(self.datas)
+    
+    def append(self, frame: FrameInfo) -> None:
+        """Add a frame to the batch"""
+        self.timestamps.append(
+            frame.timestamp if frame.timestamp is not None else math.nan
+        )
+        self.datas.append(frame.data)
+        self.widths.append(frame.width or 0)
+        self.heights.append(frame.height or 0)
+    
+    def to_frames(self) -> List[FrameInfo]:
+        """Convert back to a list of FrameInfo"""
+        frames = []
+        for timestamp, data, width, height in zip(
+            self.timestamps, self.datas, self.widths, self.heights
+        ):
+            known = not math.isnan(timestamp)
+            frames.append(FrameInfo(
+                frame_number=int(timestamp * 30) if known else None,  # Approximate
+                timestamp=timestamp if known else None,
+                data=data,
+                mime_type=self.mime_type,
+                width=width or None,
+                height=height or None,
+            ))
+        return frames
+
+
 @dataclass 
 class VideoInfo:
     """Video metadata"""
@@ -57,8 +165,23 @@ class VideoProcessor:
         self._ffprobe_path = self._find_ffprobe()
         self._has_ffmpeg = self._ffmpeg_path is not None
         
+        # LRU of open PyAV containers keyed by (path, mtime), each paired
+        # with its own lock so different videos decode in parallel
+        self._av_containers: "OrderedDict[Tuple[str, int], Tuple[object, threading.Lock]]" = OrderedDict()
+        self._av_lock = threading.Lock()
+        
+        # Fixed command prefix for extract_first_frame (input path goes after it)
+        self._first_frame_cmd_head = (
+            [self._ffmpeg_path, *FFMPEG_QUIET_ARGS, "-i"] if self._ffmpeg_path else []
+        )
+        
+        # Hardware decoder passed to FFmpeg as -hwaccel, None for software decode
+        self._hwaccel: Optional[str] = self._detect_hwaccel()
+        
         if self._has_ffmpeg:
             logger.info(f"FFmpeg found: {self._ffmpeg_path}")
+            if self._hwaccel:
+                logger.info(f"FFmpeg hardware decode: {self._hwaccel}")
         else:
             logger.warning("FFmpeg not found - using limited pure Python processing")
     
@@ -100,6 +223,61 @@ class VideoProcessor:
         
         return None
     
+    def _detect_hwaccel(self) -> Optional[str]:
+        """Pick a hardware decoder from `ffmpeg -hwaccels`, probed once at init"""
+        if not self._ffmpeg_path:
+            return None
+        
+        try:
+            result = subprocess.run(
+                [self._ffmpeg_path, "-hide_banner", "-hwaccels"],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+        except Exception as e:
+            logger.debug(f"FFmpeg hwaccel probe failed: {e}")
+            return None
+        
+        if result.returncode != 0:
+            return None
+        
+        # Output is a header line followed by one method per line
+        available = {line.strip() for line in result.stdout.splitlines()[1:]}
+        for method in HWACCEL_PREFERENCE:
+            if method in available:
+                return method
+        
+        return None
+    
+    def _run_decode(
+        self,
+        build_cmd: Callable[[Optional[str]], List[str]],
+        timeout: float,
+    ) -> subprocess.CompletedProcess:
+        """
+        Run an FFmpeg decode command with hardware acceleration if available.
+        ffmpeg -hwaccels only lists compiled-in methods, so on failure retry
+        in software. The hardware decoder is dropped for this process only
+        when the software retry succeeds; if both fail, the input or the
+        command is at fault, not the decoder.
+        """
+        hwaccel = self._hwaccel
+        result = subprocess.run(build_cmd(hwaccel), capture_output=True, timeout=timeout)
+        
+        if result.returncode != 0 and hwaccel:
+            result = subprocess.run(build_cmd(None), capture_output=True, timeout=timeout)
+            if result.returncode == 0:
+                self._disable_hwaccel(hwaccel)
+        
+        return result
+    
+    def _disable_hwaccel(self, hwaccel: str) -> None:
+        """Fall back to software decode after a hardware decode failure"""
+        if self._hwaccel == hwaccel:
+            logger.warning(f"FFmpeg hardware decode ({hwaccel}) failed - using software decode")
+            self._hwaccel = None
+    
     @property
     def has_ffmpeg(self) -> bool:
         """Check if FFmpeg is available"""
@@ -120,17 +298,8 @@ class VideoProcessor:
             return None
         
         try:
-            cmd = [
-                self._ffprobe_path,
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                "-show_streams",
-                str(video_path)
-            ]
-            
             result = subprocess.run(
-                cmd,
+                self._video_info_cmd(video_path),
                 capture_output=True,
                 text=True,
                 timeout=30
@@ -140,49 +309,65 @@ class VideoProcessor:
                 logger.error(f"FFprobe failed: {result.stderr}")
                 return None
             
-            import json
-            data = json.loads(result.stdout)
-            
-            # Find video stream
-            video_stream = None
-            for stream in data.get("streams", []):
-                if stream.get("codec_type") == "video":
-                    video_stream = stream
-                    break
-            
-            if not video_stream:
-                return None
-            
-            format_info = data.get("format", {})
-            
-            # Parse frame rate (can be "30/1" or "29.97")
-            fps_str = video_stream.get("r_frame_rate", "30/1")
-            if "/" in fps_str:
-                num, den = fps_str.split("/")
-                fps = float(num) / float(den)
-            else:
-                fps = float(fps_str)
-            
-            return VideoInfo(
-                duration=float(format_info.get("duration", 0)),
-                width=int(video_stream.get("width", 0)),
-                height=int(video_stream.get("height", 0)),
-                fps=fps,
-                frame_count=int(video_stream.get("nb_frames", 0)),
-                codec=video_stream.get("codec_name", "unknown"),
-                format=format_info.get("format_name", "unknown"),
-            )
+            return self._parse_video_info(result.stdout)
             
         except Exception as e:
             logger.error(f"Failed to get video info: {e}")
             return None
     
+    def _video_info_cmd(self, video_path: Union[str, Path]) -> List[str]:
+        """Build the FFprobe command used by get_video_info"""
+        return [
+            self._ffprobe_path,
+            "-v", "quiet",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            str(video_path)
+        ]
+    
+    def _parse_video_info(self, output: Union[str, bytes]) -> Optional[VideoInfo]:
+        """Parse FFprobe JSON output into VideoInfo"""
+        data = json.loads(output)
+        
+        # Find video stream
+        video_stream = None
+        for stream in data.get("streams", []):
+            if stream.get("codec_type") == "video":
+                video_stream = stream
+                break
+        
+        if not video_stream:
+            return None
+        
+        format_info = data.get("format", {})
+        
+        # Parse frame rate (can be "30/1" or "29.97")
+        fps_str = video_stream.get("r_frame_rate", "30/1")
+        if "/" in fps_str:
+            num, den = fps_str.split("/")
+            fps = float(num) / float(den)
+        else:
+            fps = float(fps_str)
+        
+        return VideoInfo(
+            duration=float(format_info.get("duration", 0)),
+            width=int(video_stream.get("width", 0)),
+            height=int(video_stream.get("height", 0)),
+            fps=fps,
+            frame_count=int(video_stream.get("nb_frames", 0)),
+            codec=video_stream.get("codec_name", "unknown"),
+            format=format_info.get("format_name", "unknown"),
+        )
+    
     def extract_frame(
         self,
         video_path: Union[str, Path],
         timestamp: float = 0.0,
         output_format: str = "jpeg",
         quality: int = 2,
+        width: Optional[int] = None,
+        crop: Optional[Tuple[int, int, int, int]] = None,
     ) -> Optional[FrameInfo]:
         """
         Extract a single frame at specific timestamp
@@ -192,56 +377,282 @@ class VideoProcessor:
             timestamp: Time in seconds
             output_format: Output image format (jpeg, png)
             quality: Quality for JPEG (2-31, lower is better)
+            width: Resize to this width, keeping aspect ratio
+            crop: Crop region as (x, y, width, height), applied before resize
             
         Returns:
             FrameInfo with frame data or None
         """
+        if PYAV_AVAILABLE:
+            frame = self._extract_frame_av(
+                video_path, timestamp, output_format, quality, width, crop
+            )
+            if frame:
+                return frame
+        
         if not self._ffmpeg_path:
-            return self._extract_frame_python(video_path, timestamp)
+            return self._extract_frame_python(video_path, timestamp, width, crop)
         
+        return self._extract_frame_ffmpeg(
+            video_path, ["-ss", str(timestamp)], timestamp,
+            output_format, quality, width, crop
+        )
+    
+    def _extract_frame_sseof(
+        self,
+        video_path: Union[str, Path],
+        offset: float,
+        output_format: str = "jpeg",
+        quality: int = 2,
+    ) -> Optional[FrameInfo]:
+        """
+        Extract a frame relative to the end of the video using -sseof,
+        without probing the duration first. The absolute position is not
+        known, so the returned FrameInfo has timestamp and frame_number None.
+        """
+        return self._extract_frame_ffmpeg(
+            video_path, self._sseof_seek_args(offset), None,
+            output_format, quality, None, None
+        )
+    
+    @staticmethod
+    def _sseof_seek_args(offset: float) -> List[str]:
+        """FFmpeg input args seeking relative to the end of the video"""
+        return ["-sseof", str(offset)]
+    
+    @staticmethod
+    def _last_frame_timestamp(info: Optional[VideoInfo]) -> float:
+        """Timestamp to extract the last frame from when -sseof is unavailable"""
+        if info and info.duration > 0:
+            return max(0, info.duration - LAST_FRAME_OFFSET)
+        return LAST_FRAME_FALLBACK_TIMESTAMP
+    
+    def _extract_frame_ffmpeg(
+        self,
+        video_path: Union[str, Path],
+        seek_args: List[str],
+        timestamp: Optional[float],
+        output_format: str,
+        quality: int,
+        width: Optional[int],
+        crop: Optional[Tuple[int, int, int, int]],
+    ) -> Optional[FrameInfo]:
+        """Extract a single frame with an FFmpeg subprocess"""
+        tmp_path = None
         try:
-            with tempfile.NamedTemporaryFile(
-                suffix=f".{output_format}",
-                delete=False
-            ) as tmp:
-                tmp_path = tmp.name
-            
-            cmd = [
-                self._ffmpeg_path,
-                "-ss", str(timestamp),
-                "-i", str(video_path),
-                "-vframes", "1",
-                "-q:v", str(quality),
-                "-y",
-                tmp_path
-            ]
+            tmp_path = self._frame_tmp_path(output_format)
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
+            result = self._run_decode(
+                lambda hwaccel: self._frame_cmd(
+                    video_path, seek_args, quality, width, crop, tmp_path, hwaccel
+                ),
                 timeout=30
             )
+            return self._frame_result(result, tmp_path, timestamp, output_format)
             
-            if result.returncode != 0:
-                logger.error(f"Frame extraction failed: {result.stderr.decode()}")
-                return None
+        except Exception as e:
+            logger.error(f"Frame extraction failed: {e}")
+            return None
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
+    def _frame_tmp_path(self, output_format: str) -> str:
+        """Reserve a temporary file for FFmpeg frame output"""
+        with tempfile.NamedTemporaryFile(
+            suffix=f".{output_format}",
+            delete=False
+        ) as tmp:
+            return tmp.name
+    
+    def _frame_cmd(
+        self,
+        video_path: Union[str, Path],
+        seek_args: List[str],
+        quality: int,
+        width: Optional[int],
+        crop: Optional[Tuple[int, int, int, int]],
+        output_path: str,
+        hwaccel: Optional[str] = None,
+    ) -> List[str]:
+        """Build the FFmpeg command used by extract_frame"""
+        cmd = [self._ffmpeg_path, *FFMPEG_QUIET_ARGS]
+        if hwaccel:
+            cmd.extend(["-hwaccel", hwaccel])
+        cmd.extend([
+            *seek_args,
+            "-i", str(video_path),
+            "-vframes", "1",
+            "-q:v", str(quality),
+        ])
+        
+        filters = []
+        if crop:
+            x, y, w, h = crop
+            filters.append(f"crop={w}:{h}:{x}:{y}")
+        if width:
+            filters.append(f"scale={width}:-2")
+        if filters:
+            cmd.extend(["-vf", ",".join(filters)])
+        
+        cmd.extend(["-y", output_path])
+        return cmd
+    
+    def _frame_result(
+        self,
+        result: subprocess.CompletedProcess,
+        tmp_path: str,
+        timestamp: Optional[float],
+        output_format: str,
+    ) -> Optional[FrameInfo]:
+        """Turn a finished frame-extraction FFmpeg run into FrameInfo"""
+        if result.returncode != 0:
+            logger.error("Frame extraction failed: %s", _LazyDecode(result.stderr))
+            return None
+        
+        return self._read_frame_output(tmp_path, timestamp, output_format)
+    
+    def _read_frame_output(
+        self,
+        tmp_path: str,
+        timestamp: Optional[float],
+        output_format: str,
+    ) -> FrameInfo:
+        """Load an FFmpeg-written frame file into FrameInfo"""
+        with open(tmp_path, "rb") as f:
+            frame_data = f.read()
+        
+        mime_type = "image/jpeg" if output_format == "jpeg" else "image/png"
+        
+        return FrameInfo(
+            frame_number=int(timestamp * 30) if timestamp is not None else None,  # Approximate
+            timestamp=timestamp,
+            data=frame_data,
+            mime_type=mime_type,
+        )
+    
+    def _open_av_container(self, video_path: Union[str, Path]):
+        """
+        Get an open PyAV container and its lock for the video, reusing a
+        cached handle when the file has not changed.
+        
+        _av_lock only guards the LRU bookkeeping; callers must hold the
+        returned per-container lock while seeking and decoding.
+        """
+        path = str(video_path)
+        key = (path, os.stat(path).st_mtime_ns)
+        
+        evicted = []
+        with self._av_lock:
+            entry = self._av_containers.get(key)
+            if entry is not None:
+                self._av_containers.move_to_end(key)
+                return entry
             
-            with open(tmp_path, "rb") as f:
-                frame_data = f.read()
+            entry = (av.open(path), threading.Lock())
+            self._av_containers[key] = entry
             
-            os.unlink(tmp_path)
+            while len(self._av_containers) > AV_CONTAINER_CACHE_SIZE:
+                evicted.append(self._av_containers.popitem(last=False)[1])
+        
+        self._close_av_containers(evicted)
+        return entry
+    
+    @staticmethod
+    def _close_av_containers(entries) -> None:
+        """Close containers once any in-flight decode on them has finished"""
+        for container, lock in entries:
+            with lock:
+                try:
+                    container.close()
+                except Exception:
+                    pass
+    
+    def _drop_av_container(self, video_path: Union[str, Path]) -> None:
+        """Close and forget every cached container for a path"""
+        path = str(video_path)
+        with self._av_lock:
+            dropped = [
+                self._av_containers.pop(key)
+                for key in [k for k in self._av_containers if k[0] == path]
+            ]
+        self._close_av_containers(dropped)
+    
+    def _extract_frame_av(
+        self,
+        video_path: Union[str, Path],
+        timestamp: float,
+        output_format: str = "jpeg",
+        quality: int = 2,
+        width: Optional[int] = None,
+        crop: Optional[Tuple[int, int, int, int]] = None,
+    ) -> Optional[FrameInfo]:
+        """
+        Extract a single frame in-process with PyAV
+        
+        Seeks to the keyframe before the timestamp and decodes forward until
+        the requested time is reached. Returns None so callers can fall back
+        to the FFmpeg subprocess path.
+        """
+        try:
+            container, lock = self._open_av_container(video_path)
+        except Exception as e:
+            logger.debug(f"PyAV open failed, falling back: {e}")
+            return None
+        
+        try:
+            with lock:
+                stream = container.streams.video[0]
+                time_base = stream.time_base
+                
+                # Frame pts are relative to the stream start, which is not
+                # always zero (e.g. MP4s with an edit list)
+                start = stream.start_time or 0
+                target = timestamp + (float(start * time_base) if time_base else 0.0)
+                
+                if time_base:
+                    container.seek(int(target / time_base), stream=stream)
+                else:
+                    container.seek(int(target * av.time_base))
+                
+                # Keep the latest decoded frame so a timestamp past the end
+                # still yields the last frame of the video
+                frame = None
+                for decoded in container.decode(stream):
+                    frame = decoded
+                    if decoded.pts is None or not time_base:
+                        break
+                    if decoded.pts * time_base >= target:
+                        break
+                
+                if frame is None:
+                    return None
+                
+                image = frame.to_image()
             
-            mime_type = "image/jpeg" if output_format == "jpeg" else "image/png"
+            # Encoding only touches the decoded image, so release the
+            # container for other requests first
+            image = _crop_and_resize(image, width, crop)
+            buffer = io.BytesIO()
+            if output_format == "jpeg":
+                image.save(buffer, format="JPEG", quality=_jpeg_quality(quality))
+                mime_type = "image/jpeg"
+            else:
+                image.save(buffer, format="PNG")
+                mime_type = "image/png"
             
             return FrameInfo(
                 frame_number=int(timestamp * 30),  # Approximate
                 timestamp=timestamp,
-                data=frame_data,
+                data=buffer.getvalue(),
                 mime_type=mime_type,
+                width=image.width,
+                height=image.height,
             )
             
         except Exception as e:
-            logger.error(f"Frame extraction failed: {e}")
+            logger.debug(f"PyAV frame extraction failed, falling back: {e}")
+            self._drop_av_container(video_path)
             return None
     
     def extract_first_frame(
@@ -249,7 +660,38 @@ class VideoProcessor:
         video_path: Union[str, Path],
     ) -> Optional[FrameInfo]:
         """Extract the first frame of a video"""
-        return self.extract_frame(video_path, timestamp=0.0)
+        if PYAV_AVAILABLE or not self._ffmpeg_path:
+            return self.extract_frame(video_path, timestamp=0.0)
+        
+        try:
+            result = subprocess.run(
+                self._first_frame_cmd(video_path),
+                capture_output=True,
+                timeout=30
+            )
+            return self._first_frame_result(result)
+            
+        except Exception as e:
+            logger.error(f"First frame extraction failed: {e}")
+            return None
+    
+    def _first_frame_cmd(self, video_path: Union[str, Path]) -> List[str]:
+        """Build the seek-free FFmpeg command used by extract_first_frame"""
+        return [*self._first_frame_cmd_head, str(video_path), *FIRST_FRAME_OUTPUT_ARGS]
+    
+    @staticmethod
+    def _first_frame_result(result: subprocess.CompletedProcess) -> Optional[FrameInfo]:
+        """Turn a finished _first_frame_cmd run into FrameInfo"""
+        if result.returncode != 0 or not result.stdout:
+            logger.error("First frame extraction failed: %s", _LazyDecode(result.stderr))
+            return None
+        
+        return FrameInfo(
+            frame_number=0,
+            timestamp=0.0,
+            data=result.stdout,
+            mime_type="image/jpeg",
+        )
     
     def extract_last_frame(
         self,
@@ -258,16 +700,19 @@ class VideoProcessor:
         """
         Extract the last frame of a video
         This is useful for video extension (Flow-like feature)
-        """
-        info = self.get_video_info(video_path)
         
-        if info and info.duration > 0:
-            # Get frame 0.1 seconds before the end
-            timestamp = max(0, info.duration - 0.1)
-            return self.extract_frame(video_path, timestamp=timestamp)
+        The frame's timestamp is None when it was seeked from the end
+        without probing the duration.
+        """
+        # Seek relative to the end directly; only probe the duration
+        # if the demuxer does not support end-relative seeking
+        if self._ffmpeg_path:
+            frame = self._extract_frame_sseof(video_path, -LAST_FRAME_OFFSET)
+            if frame:
+                return frame
         
-        # Fallback: try getting a late frame
-        return self.extract_frame(video_path, timestamp=10.0)
+        timestamp = self._last_frame_timestamp(self.get_video_info(video_path))
+        return self.extract_frame(video_path, timestamp=timestamp)
     
     def extract_frames_at_intervals(
         self,
@@ -286,20 +731,43 @@ class VideoProcessor:
         Returns:
             List of FrameInfo objects
         """
-        frames = []
+        return self.extract_frames_at_intervals_batch(
+            video_path, interval, max_frames
+        ).to_frames()
+    
+    def extract_frames_at_intervals_batch(
+        self,
+        video_path: Union[str, Path],
+        interval: float = 1.0,
+        max_frames: int = 10,
+    ) -> FrameBatch:
+        """
+        Extract frames at regular intervals into a FrameBatch
+        
+        Args:
+            video_path: Path to video file
+            interval: Time between frames in seconds
+            max_frames: Maximum number of frames to extract
+            
+        Returns:
+            FrameBatch with one entry per extracted frame
+        """
+        batch = FrameBatch()
         info = self.get_video_info(video_path)
         
-        if not info:
-            return frames
+        if not info or interval <= 0:
+            return batch
+        
+        # Multiply instead of accumulating to avoid floating point drift
+        count = min(math.ceil(info.duration / interval), max_frames)
+        timestamps = [i * interval for i in range(count)]
         
-        current_time = 0.0
-        while current_time < info.duration and len(frames) < max_frames:
-            frame = self.extract_frame(video_path, timestamp=current_time)
+        for timestamp in timestamps:
+            frame = self.extract_frame(video_path, timestamp=timestamp)
             if frame:
-                frames.append(frame)
-            current_time += interval
+                batch.append(frame)
         
-        return frames
+        return batch
     
     def concatenate_videos(
         self,
@@ -357,6 +825,7 @@ class VideoProcessor:
         try:
             cmd = [
                 self._ffmpeg_path,
+                *FFMPEG_QUIET_ARGS,
                 "-f", "concat",
                 "-safe", "0",
                 "-i", list_path,
@@ -372,7 +841,7 @@ class VideoProcessor:
             )
             
             if result.returncode != 0:
-                logger.error(f"Concatenation failed: {result.stderr.decode()}")
+                logger.error("Concatenation failed: %s", _LazyDecode(result.stderr))
                 return False
             
             return True
@@ -417,6 +886,7 @@ class VideoProcessor:
         
         cmd = [
             self._ffmpeg_path,
+            *FFMPEG_QUIET_ARGS,
             *inputs,
             "-filter_complex", filter_complex,
             "-map", output_stream,
@@ -431,7 +901,7 @@ class VideoProcessor:
         )
         
         if result.returncode != 0:
-            logger.error(f"Crossfade concat failed: {result.stderr.decode()}")
+            logger.error("Crossfade concat failed: %s", _LazyDecode(result.stderr))
             return False
         
         return True
@@ -460,19 +930,224 @@ class VideoProcessor:
             return False
         
         try:
-            cmd = [
-                self._ffmpeg_path,
-                "-ss", str(timestamp),
-                "-i", str(video_path),
-                "-vframes", "1",
-                "-vf", f"scale={width}:-1",
-                "-y",
-                str(output_path)
-            ]
+            result = self._run_decode(
+                lambda hwaccel: self._thumbnail_cmd(
+                    video_path, output_path, width, timestamp, hwaccel
+                ),
+                timeout=30
+            )
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
+            return result.returncode == 0
+            
+        except Exception as e:
+            logger.error(f"Thumbnail generation failed: {e}")
+            return False
+    
+    def _thumbnail_cmd(
+        self,
+        video_path: Union[str, Path],
+        output_path: Union[str, Path],
+        width: int,
+        timestamp: float,
+        hwaccel: Optional[str] = None,
+    ) -> List[str]:
+        """Build the FFmpeg command used by generate_thumbnail"""
+        hwaccel_args = ["-hwaccel", hwaccel] if hwaccel else []
+        return [
+            self._ffmpeg_path,
+            *FFMPEG_QUIET_ARGS,
+            *hwaccel_args,
+            "-ss", str(timestamp),
+            "-i", str(video_path),
+            "-vframes", "1",
+            "-vf", f"scale={width}:-1",
+            "-y",
+            str(output_path)
+        ]
+    
+    # ==================== Async API ====================
+    # Same behaviour as the sync methods, but FFmpeg/FFprobe run via
+    # asyncio subprocesses so independent calls can be awaited together:
+    #
+    #   info, first, last = await asyncio.gather(
+    #       processor.aget_video_info(path),
+    #       processor.aextract_first_frame(path),
+    #       processor.aextract_last_frame(path),
+    #   )
+    
+    async def _run_async(
+        self,
+        cmd: List[str],
+        timeout: float,
+    ) -> subprocess.CompletedProcess:
+        """Run a command without blocking the event loop"""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    
+    async def _arun_decode(
+        self,
+        build_cmd: Callable[[Optional[str]], List[str]],
+        timeout: float,
+    ) -> subprocess.CompletedProcess:
+        """Async version of _run_decode"""
+        hwaccel = self._hwaccel
+        result = await self._run_async(build_cmd(hwaccel), timeout)
+        
+        if result.returncode != 0 and hwaccel:
+            result = await self._run_async(build_cmd(None), timeout)
+            if result.returncode == 0:
+                self._disable_hwaccel(hwaccel)
+        
+        return result
+    
+    async def aget_video_info(self, video_path: Union[str, Path]) -> Optional[VideoInfo]:
+        """Async version of get_video_info"""
+        if not self._ffprobe_path:
+            logger.warning("FFprobe not available")
+            return None
+        
+        try:
+            result = await self._run_async(self._video_info_cmd(video_path), timeout=30)
+            
+            if result.returncode != 0:
+                logger.error("FFprobe failed: %s", _LazyDecode(result.stderr))
+                return None
+            
+            return self._parse_video_info(result.stdout)
+            
+        except Exception as e:
+            logger.error(f"Failed to get video info: {e}")
+            return None
+    
+    async def aextract_frame(
+        self,
+        video_path: Union[str, Path],
+        timestamp: float = 0.0,
+        output_format: str = "jpeg",
+        quality: int = 2,
+        width: Optional[int] = None,
+        crop: Optional[Tuple[int, int, int, int]] = None,
+    ) -> Optional[FrameInfo]:
+        """Async version of extract_frame"""
+        if PYAV_AVAILABLE:
+            frame = await to_thread(
+                self._extract_frame_av,
+                video_path, timestamp, output_format, quality, width, crop
+            )
+            if frame:
+                return frame
+        
+        if not self._ffmpeg_path:
+            return await to_thread(
+                self._extract_frame_python, video_path, timestamp, width, crop
+            )
+        
+        return await self._aextract_frame_ffmpeg(
+            video_path, ["-ss", str(timestamp)], timestamp,
+            output_format, quality, width, crop
+        )
+    
+    async def _aextract_frame_ffmpeg(
+        self,
+        video_path: Union[str, Path],
+        seek_args: List[str],
+        timestamp: Optional[float],
+        output_format: str,
+        quality: int,
+        width: Optional[int],
+        crop: Optional[Tuple[int, int, int, int]],
+    ) -> Optional[FrameInfo]:
+        """Async version of _extract_frame_ffmpeg"""
+        tmp_path = None
+        try:
+            tmp_path = self._frame_tmp_path(output_format)
+            
+            result = await self._arun_decode(
+                lambda hwaccel: self._frame_cmd(
+                    video_path, seek_args, quality, width, crop, tmp_path, hwaccel
+                ),
+                timeout=30
+            )
+            return self._frame_result(result, tmp_path, timestamp, output_format)
+            
+        except Exception as e:
+            logger.error(f"Frame extraction failed: {e}")
+            return None
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
+    async def aextract_first_frame(
+        self,
+        video_path: Union[str, Path],
+    ) -> Optional[FrameInfo]:
+        """Async version of extract_first_frame"""
+        if PYAV_AVAILABLE or not self._ffmpeg_path:
+            return await self.aextract_frame(video_path, timestamp=0.0)
+        
+        try:
+            result = await self._run_async(self._first_frame_cmd(video_path), timeout=30)
+            return self._first_frame_result(result)
+            
+        except Exception as e:
+            logger.error(f"First frame extraction failed: {e}")
+            return None
+    
+    async def aextract_last_frame(
+        self,
+        video_path: Union[str, Path],
+    ) -> Optional[FrameInfo]:
+        """Async version of extract_last_frame"""
+        if self._ffmpeg_path:
+            frame = await self._aextract_frame_sseof(video_path, -LAST_FRAME_OFFSET)
+            if frame:
+                return frame
+        
+        timestamp = self._last_frame_timestamp(await self.aget_video_info(video_path))
+        return await self.aextract_frame(video_path, timestamp=timestamp)
+    
+    async def _aextract_frame_sseof(
+        self,
+        video_path: Union[str, Path],
+        offset: float,
+        output_format: str = "jpeg",
+        quality: int = 2,
+    ) -> Optional[FrameInfo]:
+        """Async version of _extract_frame_sseof"""
+        return await self._aextract_frame_ffmpeg(
+            video_path, self._sseof_seek_args(offset), None,
+            output_format, quality, None, None
+        )
+    
+    async def agenerate_thumbnail(
+        self,
+        video_path: Union[str, Path],
+        output_path: Union[str, Path],
+        width: int = 320,
+        timestamp: float = 1.0,
+    ) -> bool:
+        """Async version of generate_thumbnail"""
+        if not self._ffmpeg_path:
+            logger.error("FFmpeg required for thumbnail generation")
+            return False
+        
+        try:
+            result = await self._arun_decode(
+                lambda hwaccel: self._thumbnail_cmd(
+                    video_path, output_path, width, timestamp, hwaccel
+                ),
                 timeout=30
             )
             
@@ -486,6 +1161,8 @@ class VideoProcessor:
         self,
         video_path: Union[str, Path],
         timestamp: float,
+        width: Optional[int] = None,
+        crop: Optional[Tuple[int, int, int, int]] = None,
     ) -> Optional[FrameInfo]:
         """
         Pure Python frame extraction fallback (limited functionality)
@@ -496,9 +1173,15 @@ class VideoProcessor:
             
             frames = iio.imread(str(video_path), index=int(timestamp * 30))
             
+            # Crop on the numpy array (a view, no copy) before handing the
+            # smaller region to PIL, so no pixel loop ever runs in Python
+            if crop:
+                x, y, w, h = crop
+                frames = frames[y:y + h, x:x + w]
+            
             # Convert numpy array to JPEG bytes
             from PIL import Image
-            img = Image.fromarray(frames)
+            img = _crop_and_resize(Image.fromarray(frames), width, None)
             
             buffer = io.BytesIO()
             img.save(buffer, format="JPEG", quality=85)
@@ -509,6 +1192,8 @@ class VideoProcessor:
                 timestamp=timestamp,
                 data=frame_data,
                 mime_type="image/jpeg",
+                width=img.width,
+                height=img.height,
             )
             
         except ImportError:
@@ -538,9 +1223,38 @@ class VideoProcessor:
             logger.error(f"Failed to save video: {e}")
             return False
     
+    def frame_to_base64_bytes(self, frame: FrameInfo) -> bytes:
+        """Convert frame data to base64 as ASCII bytes (no str decode)"""
+        return base64.b64encode(frame.data)
+    
+    def frame_to_base64_str(self, frame: FrameInfo) -> str:
+        """Convert frame data to base64 string (for JSON payloads)"""
+        return self.frame_to_base64_bytes(frame).decode("ascii")
+    
+    def frame_data_view(self, frame: FrameInfo) -> memoryview:
+        """Zero-copy view of the raw frame bytes, for consumers that accept binary"""
+        return memoryview(frame.data)
+    
     def frame_to_base64(self, frame: FrameInfo) -> str:
         """Convert frame data to base64 string"""
-        return base64.b64encode(frame.data).decode()
+        return self.frame_to_base64_str(frame)
+
+
+def _jpeg_quality(qscale: int) -> int:
+    """Map an FFmpeg -q:v scale (2-31, lower is better) to a PIL JPEG quality"""
+    qscale = min(max(qscale, 2), 31)
+    return round(95 - (qscale - 2) * 85 / 29)
+
+
+def _crop_and_resize(image, width: Optional[int], crop: Optional[Tuple[int, int, int, int]]):
+    """Apply optional crop (x, y, width, height) and aspect-preserving resize to a PIL image"""
+    if crop:
+        x, y, w, h = crop
+        image = image.crop((x, y, x + w, y + h))
+    if width and image.width != width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height))
+    return image
 
 
 # Global processor instance
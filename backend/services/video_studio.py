@@ -8,41 +8,184 @@ Advanced video generation features like Google Flow:
 """
 
 import json
+import os
 import time
-import uuid
+import itertools
 import base64
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List, Union
-from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Union, Tuple
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
-from ..core.config import Config, BEIJING_TZ
+from ..core.config import Config, GeminiEndpoints, BEIJING_TZ
 from ..core.account_pool import Account, get_account_pool
 from ..core.session_manager import (
     get_session_manager,
     get_common_headers,
     Session,
 )
-from .video_processor import get_video_processor, VideoProcessor
+from .video_processor import (
+    get_video_processor,
+    VideoProcessor,
+    FrameInfo,
+    VideoInfo,
+    to_thread,
+)
 
 logger = logging.getLogger("gemini.video_studio")
 
+# Base64 codec: pybase64 (SIMD) when installed, stdlib otherwise
+try:
+    import pybase64
+    _b64encode = pybase64.b64encode_as_string
+    _b64decode = pybase64.b64decode
+except ImportError:
+    def _b64encode(data: bytes) -> str:
+        return base64.b64encode(data).decode()
+    _b64decode = base64.b64decode
+
+# JSON encoder for request bodies: orjson when installed, stdlib otherwise
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Request/file ids: random per-process prefix plus a counter, so ids stay
+# unique across restarts without an os.urandom call per id
+_ID_PREFIX = os.urandom(3).hex()
+_id_counter = itertools.count()
+
+# Leading magic bytes for MIME sniffing of uploaded media
+IMAGE_SIGNATURES = (
+    (b'\x89PNG', "image/png"),
+    (b'\xff\xd8\xff', "image/jpeg"),
+    (b'GIF8', "image/gif"),
+)
+VIDEO_SIGNATURES = (
+    (b'\x1a\x45\xdf\xa3', "video/webm"),
+)
+
+# Polling for the generated video file after StreamAssist returns
+VIDEO_POLL_INITIAL_DELAY = 0.25
+VIDEO_POLL_MAX_DELAY = 3.0
+VIDEO_POLL_TIMEOUT_SECONDS = 60.0
+
+# Base64 input is decoded and written in windows of this many characters
+# (a multiple of 4) so large videos never exist fully decoded in memory
+B64_WRITE_CHUNK_CHARS = 4 << 20
+VIDEO_WRITE_BUFFER_SIZE = 1 << 20
+
+# Bounded pool for blocking FFmpeg jobs (concatenation re-encodes and can take
+# minutes); the work runs in the ffmpeg child process, so threads only wait on it
+_ffmpeg_executor = ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1),
+    thread_name_prefix="ffmpeg",
+)
+
+
+def _short_id() -> str:
+    """Short unique id for conversation keys and video file names"""
+    return f"{_ID_PREFIX}{next(_id_counter):04x}"
+
+
+def _encode_images(images: List[Union[str, bytes]]) -> List[str]:
+    """Base64 encode image inputs in one pass, passing base64 strings through"""
+    return [_b64encode(img) if isinstance(img, bytes) else img for img in images]
+
+
+def _sniff_video_mime(header: bytes) -> str:
+    """Detect video MIME type from the first bytes of raw video data"""
+    if b'ftyp' in header:
+        return "video/mp4"
+    
+    for signature, mime_type in VIDEO_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    
+    return "video/mp4"  # Default
+
+
+@lru_cache(maxsize=1024)
+def _detect_image_mime_cached(prefix: str) -> str:
+    """Detect image MIME type from a base64 prefix (memoised, inputs repeat often)"""
+    try:
+        header = _b64decode(prefix)
+    except Exception:
+        return "image/jpeg"
+    
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return "image/webp"
+    
+    return "image/jpeg"  # Default
+
+
+@lru_cache(maxsize=1024)
+def _detect_video_mime_cached(prefix: str) -> str:
+    """Detect video MIME type from a base64 prefix (memoised, inputs repeat often)"""
+    try:
+        header = _b64decode(prefix)
+    except Exception:
+        return "video/mp4"
+    
+    return _sniff_video_mime(header)
+
+
+def _write_video_file(filepath: Path, data: Union[bytes, bytearray, memoryview, str]) -> None:
+    """Write raw or base64 video data to disk, decoding base64 chunk by chunk"""
+    with open(filepath, "wb", buffering=VIDEO_WRITE_BUFFER_SIZE) as f:
+        if not isinstance(data, str):
+            # Any bytes-like buffer is written as is; writes larger than the
+            # buffer go straight to the file without an intermediate copy
+            f.write(memoryview(data))
+            return
+        
+        try:
+            for start in range(0, len(data), B64_WRITE_CHUNK_CHARS):
+                f.write(_b64decode(data[start:start + B64_WRITE_CHUNK_CHARS]))
+        except ValueError:
+            # Whitespace or other ignored characters broke 4-char alignment,
+            # decode the whole payload at once instead
+            f.seek(0)
+            f.truncate()
+            f.write(_b64decode(data))
+
 
 @dataclass
 class VideoGenerationResult:
     """Result of a video generation request"""
     success: bool = False
     video_id: Optional[str] = None
-    video_data: Optional[str] = None  # Base64 encoded
+    video_data: Optional[bytes] = None  # Raw video bytes
     video_url: Optional[str] = None
     mime_type: str = "video/mp4"
     duration: Optional[float] = None
     width: Optional[int] = None
     height: Optional[int] = None
     error: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None  # Created on first write
+    
+    @property
+    def video_data_b64(self) -> Optional[str]:
+        """Base64 encoded video data, encoded on access for JSON responses"""
+        if self.video_data is None:
+            return None
+        return _b64encode(self.video_data)
+    
+    def ensure_metadata(self) -> Dict[str, Any]:
+        """Get the metadata dict, creating it if needed"""
+        if self.metadata is None:
+            self.metadata = {}
+        return self.metadata
 
 
 @dataclass
@@ -50,12 +193,19 @@ class VideoExtensionResult:
     """Result of a video extension request"""
     success: bool = False
     original_video_url: Optional[str] = None
-    extended_video_data: Optional[str] = None  # Base64 encoded
+    extended_video_data: Optional[bytes] = None  # Raw video bytes
     extended_video_url: Optional[str] = None
     last_frame_used: Optional[str] = None  # Base64 of extracted last frame
     extension_duration: Optional[float] = None
     total_duration: Optional[float] = None
     error: Optional[str] = None
+    
+    @property
+    def extended_video_data_b64(self) -> Optional[str]:
+        """Base64 encoded extended video, encoded on access for JSON responses"""
+        if self.extended_video_data is None:
+            return None
+        return _b64encode(self.extended_video_data)
 
 
 class VideoStudio:
@@ -69,9 +219,22 @@ class VideoStudio:
     - interpolate_frames: Generate video between start and end frames
     """
     
+    __slots__ = (
+        "_account_pool",
+        "_session_manager",
+        "_http_client",
+        "_processor",
+        "VIDEO_MODELS",
+        "DEFAULT_MODEL",
+        "_model_id_cache",
+        "_stream_assist_url",
+        "_body_template",
+    )
+    
     def __init__(self):
         self._account_pool = get_account_pool()
         self._session_manager = get_session_manager()
+        # Shared pooled client (see get_http_client); never create one per request
         self._http_client = self._account_pool.http_client
         self._processor = get_video_processor()
         
@@ -85,6 +248,30 @@ class VideoStudio:
         
         # Default model for video generation
         self.DEFAULT_MODEL = "gemini-3-pro-preview-video"
+        
+        # Resolved once, used on every generation request
+        self._model_id_cache = {m: Config.get_model_id(m) for m in self.VIDEO_MODELS}
+        self._stream_assist_url = GeminiEndpoints.STREAM_ASSIST
+        
+        # Request body matching Gemini Business API format exactly;
+        # configId, session and query are filled in per request
+        self._body_template = {
+            "configId": None,
+            "additionalParams": {"token": "-"},
+            "streamAssistRequest": {
+                "session": None,
+                "query": None,
+                "filter": "",
+                "fileIds": [],
+                "answerGenerationMode": "NORMAL",
+                "toolsSpec": {
+                    "videoGenerationSpec": {},
+                },
+                "languageCode": "zh-CN",
+                "userMetadata": {"timeZone": "Etc/GMT-8"},
+                "assistSkippingMode": "REQUEST_ASSIST",
+            },
+        }
     
     @property
     def processor(self) -> VideoProcessor:
@@ -120,12 +307,12 @@ class VideoStudio:
         
         try:
             # Get account and session
-            account = await self._account_pool.get_next_available()
-            if not account:
+            prepared = await self._prepare("video")
+            if not prepared:
                 return VideoGenerationResult(success=False, error="No accounts available")
             
-            conv_key = f"video_{uuid.uuid4().hex[:8]}"
-            session = await self._session_manager.get_or_create_session(account, conv_key)
+            account, session_task = prepared
+            session = await session_task
             
             # Send video generation request
             result = await self._generate_video(account, session, full_prompt, model)
@@ -133,14 +320,14 @@ class VideoStudio:
             if result.success:
                 # Save video to cache
                 if result.video_data:
-                    video_path = self._save_video(result.video_data, result.mime_type)
+                    video_path = await self._save_video(result.video_data, result.mime_type)
                     result.video_url = f"/video/{video_path.name}"
-                    result.metadata["local_path"] = str(video_path)
+                    result.ensure_metadata()["local_path"] = str(video_path)
             
             return result
             
         except Exception as e:
-            logger.error(f"Text to video failed: {e}")
+            logger.error("Text to video failed: %s", e)
             return VideoGenerationResult(success=False, error=str(e))
     
     async def images_to_video(
@@ -168,27 +355,26 @@ class VideoStudio:
         model = model or self.DEFAULT_MODEL
         
         try:
-            account = await self._account_pool.get_next_available()
-            if not account:
+            prepared = await self._prepare("img2vid")
+            if not prepared:
                 return VideoGenerationResult(success=False, error="No accounts available")
             
-            conv_key = f"img2vid_{uuid.uuid4().hex[:8]}"
-            session = await self._session_manager.get_or_create_session(account, conv_key)
+            # Encode images on a worker thread while the session is created
+            account, session_task = prepared
+            session, encoded = await asyncio.gather(
+                session_task,
+                to_thread(_encode_images, images),
+            )
             
-            # Upload images to session
-            file_ids = []
-            for i, img in enumerate(images):
-                if isinstance(img, bytes):
-                    img = base64.b64encode(img).decode()
-                
-                # Detect mime type from base64
-                mime_type = self._detect_image_mime(img)
-                
-                file_id = await self._session_manager.upload_file(
-                    account, session, mime_type, img
+            # Upload images concurrently; gather keeps the ids in input order
+            # and they are sent as fileIds, so completion order does not matter
+            file_ids = await asyncio.gather(*(
+                self._session_manager.upload_file(
+                    account, session, self._detect_image_mime(img), img
                 )
-                file_ids.append(file_id)
-                logger.info(f"Uploaded image {i+1}/{len(images)}: {file_id}")
+                for img in encoded
+            ))
+            logger.info("Uploaded %d images: %s", len(file_ids), file_ids)
             
             # Build prompt
             if prompt:
@@ -202,18 +388,21 @@ class VideoStudio:
                     full_prompt += f" {prompt}"
             
             # Generate video
-            result = await self._generate_video(account, session, full_prompt, model)
+            result = await self._generate_video(
+                account, session, full_prompt, model, file_ids=file_ids
+            )
             
             if result.success and result.video_data:
-                video_path = self._save_video(result.video_data, result.mime_type)
+                video_path = await self._save_video(result.video_data, result.mime_type)
                 result.video_url = f"/video/{video_path.name}"
-                result.metadata["local_path"] = str(video_path)
-                result.metadata["source_images"] = len(images)
+                metadata = result.ensure_metadata()
+                metadata["local_path"] = str(video_path)
+                metadata["source_images"] = len(images)
             
             return result
             
         except Exception as e:
-            logger.error(f"Images to video failed: {e}")
+            logger.error("Images to video failed: %s", e)
             return VideoGenerationResult(success=False, error=str(e))
     
     async def extend_video(
@@ -246,46 +435,56 @@ class VideoStudio:
         model = model or self.DEFAULT_MODEL
         
         try:
-            account = await self._account_pool.get_next_available()
-            if not account:
+            prepared = await self._prepare("extend")
+            if not prepared:
                 return VideoExtensionResult(success=False, error="No accounts available")
             
-            conv_key = f"extend_{uuid.uuid4().hex[:8]}"
-            session = await self._session_manager.get_or_create_session(account, conv_key)
-            
-            # Convert video to base64 if bytes
-            if isinstance(video, bytes):
-                video_b64 = base64.b64encode(video).decode()
-            else:
-                video_b64 = video
+            account, session_task = prepared
+            session = await session_task
             
             # Save original video temporarily for processing
             original_path = None
             last_frame_b64 = None
+            video_info = None
             
-            if auto_detect_end_frame and self._processor.has_ffmpeg:
-                # Save video temporarily to extract last frame
-                original_path = Config.VIDEO_SAVE_DIR / f"original_{uuid.uuid4().hex[:8]}.mp4"
-                video_bytes = base64.b64decode(video_b64)
-                with open(original_path, "wb") as f:
-                    f.write(video_bytes)
-                
-                # Extract last frame
-                last_frame = self._processor.extract_last_frame(original_path)
-                if last_frame:
-                    last_frame_b64 = self._processor.frame_to_base64(last_frame)
-                    logger.info(f"Extracted last frame from video for better continuation")
-                    
-                    # Upload last frame as reference
-                    await self._session_manager.upload_file(
-                        account, session, last_frame.mime_type, last_frame_b64
-                    )
+            # Bytes input is written to disk as is and only base64 encoded
+            # for the upload itself; base64 input is only decoded for disk
+            if isinstance(video, bytes):
+                video_mime = _sniff_video_mime(video[:24])
+                upload_original = self._session_manager.upload_file_bytes(
+                    account, session, video_mime, video
+                )
+            else:
+                video_mime = self._detect_video_mime(video)
+                upload_original = self._session_manager.upload_file(
+                    account, session, video_mime, video
+                )
             
-            # Upload original video
-            video_mime = self._detect_video_mime(video_b64)
-            await self._session_manager.upload_file(
-                account, session, video_mime, video_b64
-            )
+            # Upload the original video while the local copy is saved and its
+            # last frame and metadata are extracted. The frame still comes
+            # first in fileIds, as it did when it was uploaded first
+            upload_task = asyncio.ensure_future(upload_original)
+            file_ids = []
+            try:
+                if auto_detect_end_frame and self._processor.has_ffmpeg:
+                    original_path = Config.VIDEO_SAVE_DIR / f"original_{_short_id()}.mp4"
+                    last_frame, video_info = await self._inspect_original(original_path, video)
+                    
+                    if last_frame:
+                        last_frame_b64 = self._processor.frame_to_base64_str(last_frame)
+                        logger.info("Extracted last frame from video for better continuation")
+                        
+                        # Upload last frame as reference
+                        file_ids.append(await self._session_manager.upload_file(
+                            account, session, last_frame.mime_type, last_frame_b64
+                        ))
+                
+                file_ids.append(await upload_task)
+            except BaseException:
+                # Don't leave the upload running (or its error unretrieved)
+                upload_task.cancel()
+                await asyncio.gather(upload_task, return_exceptions=True)
+                raise
             
             # Build extension prompt
             if prompt:
@@ -301,7 +500,9 @@ class VideoStudio:
                 full_prompt += " Use the uploaded last frame as the starting point for the continuation."
             
             # Generate extension
-            gen_result = await self._generate_video(account, session, full_prompt, model)
+            gen_result = await self._generate_video(
+                account, session, full_prompt, model, file_ids=file_ids
+            )
             
             if gen_result.success:
                 result = VideoExtensionResult(
@@ -312,38 +513,57 @@ class VideoStudio:
                 )
                 
                 if gen_result.video_data:
-                    extension_path = self._save_video(gen_result.video_data, gen_result.mime_type)
+                    extension_path = await self._save_video(gen_result.video_data, gen_result.mime_type)
                     result.extended_video_url = f"/video/{extension_path.name}"
                     
                     # Optionally concatenate original + extension
                     if concatenate and original_path and self._processor.has_ffmpeg:
-                        concat_path = Config.VIDEO_SAVE_DIR / f"concat_{uuid.uuid4().hex[:8]}.mp4"
-                        success = self._processor.concatenate_videos(
-                            [original_path, extension_path],
-                            concat_path,
-                            crossfade_duration=0.5,  # Smooth transition
+                        concat_path = Config.VIDEO_SAVE_DIR / f"concat_{_short_id()}.mp4"
+                        loop = asyncio.get_running_loop()
+                        success = await loop.run_in_executor(
+                            _ffmpeg_executor,
+                            partial(
+                                self._processor.concatenate_videos,
+                                [original_path, extension_path],
+                                concat_path,
+                                crossfade_duration=0.5,  # Smooth transition
+                            ),
                         )
                         
                         if success:
                             result.extended_video_url = f"/video/{concat_path.name}"
-                            result.extended_video_data = self._processor.video_to_base64(concat_path)
-                            logger.info(f"Concatenated original + extension: {concat_path}")
+                            result.extended_video_data = await to_thread(
+                                concat_path.read_bytes
+                            )
+                            logger.info("Concatenated original + extension: %s", concat_path)
                 
                 # Get video info
-                if original_path:
-                    video_info = self._processor.get_video_info(original_path)
-                    if video_info:
-                        result.total_duration = video_info.duration + extension_duration
-                        result.original_video_url = f"/video/{original_path.name}"
+                if original_path and video_info:
+                    result.total_duration = video_info.duration + extension_duration
+                    result.original_video_url = f"/video/{original_path.name}"
                 
                 return result
             else:
                 return VideoExtensionResult(success=False, error=gen_result.error)
             
         except Exception as e:
-            logger.error(f"Video extension failed: {e}")
+            logger.error("Video extension failed: %s", e)
             return VideoExtensionResult(success=False, error=str(e))
     
+    async def _inspect_original(
+        self,
+        original_path: Path,
+        data: Union[bytes, str],
+    ) -> Tuple[Optional[FrameInfo], Optional[VideoInfo]]:
+        """Save the original video locally, then extract its last frame and metadata concurrently"""
+        await to_thread(_write_video_file, original_path, data)
+        
+        last_frame, video_info = await asyncio.gather(
+            self._processor.aextract_last_frame(original_path),
+            self._processor.aget_video_info(original_path),
+        )
+        return last_frame, video_info
+    
     async def interpolate_frames(
         self,
         start_frame: Union[str, bytes],
@@ -372,18 +592,16 @@ class VideoStudio:
         model = model or self.DEFAULT_MODEL
         
         try:
-            account = await self._account_pool.get_next_available()
-            if not account:
+            prepared = await self._prepare("interp")
+            if not prepared:
                 return VideoGenerationResult(success=False, error="No accounts available")
             
-            conv_key = f"interp_{uuid.uuid4().hex[:8]}"
-            session = await self._session_manager.get_or_create_session(account, conv_key)
-            
-            # Convert frames to base64 if bytes
-            if isinstance(start_frame, bytes):
-                start_frame = base64.b64encode(start_frame).decode()
-            if isinstance(end_frame, bytes):
-                end_frame = base64.b64encode(end_frame).decode()
+            # Convert frames to base64 if bytes while the session is created
+            account, session_task = prepared
+            session, (start_frame, end_frame) = await asyncio.gather(
+                session_task,
+                to_thread(_encode_images, [start_frame, end_frame]),
+            )
             
             # Upload both frames
             start_mime = self._detect_image_mime(start_frame)
@@ -396,7 +614,7 @@ class VideoStudio:
                 account, session, end_mime, end_frame
             )
             
-            logger.info(f"Uploaded frames: start={start_id}, end={end_id}")
+            logger.info("Uploaded frames: start=%s, end=%s", start_id, end_id)
             
             # Build interpolation prompt
             base_prompt = (
@@ -414,92 +632,114 @@ class VideoStudio:
             result = await self._generate_video(account, session, full_prompt, model)
             
             if result.success and result.video_data:
-                video_path = self._save_video(result.video_data, result.mime_type)
+                video_path = await self._save_video(result.video_data, result.mime_type)
                 result.video_url = f"/video/{video_path.name}"
-                result.metadata["local_path"] = str(video_path)
-                result.metadata["interpolation_type"] = "frame_to_frame"
+                metadata = result.ensure_metadata()
+                metadata["local_path"] = str(video_path)
+                metadata["interpolation_type"] = "frame_to_frame"
             
             return result
             
         except Exception as e:
-            logger.error(f"Frame interpolation failed: {e}")
+            logger.error("Frame interpolation failed: %s", e)
             return VideoGenerationResult(success=False, error=str(e))
     
+    async def _prepare(
+        self,
+        conv_prefix: str,
+    ) -> Optional[Tuple[Account, "asyncio.Task[Session]"]]:
+        """
+        Pick an account and start creating its session
+        
+        Returns the account and a task for the session so callers can overlap
+        session creation with local work, or None if no account is available.
+        """
+        account = await self._account_pool.get_next_available()
+        if not account:
+            return None
+        
+        conv_key = f"{conv_prefix}_{_short_id()}"
+        session_task = asyncio.create_task(
+            self._session_manager.get_or_create_session(account, conv_key)
+        )
+        return account, session_task
+    
     async def _generate_video(
         self,
         account: Account,
         session: Session,
         prompt: str,
         model: str,
+        file_ids: Optional[List[str]] = None,
     ) -> VideoGenerationResult:
-        """Internal method to generate video using Gemini API"""
-        from ..core.config import GeminiEndpoints
+        """
+        Internal method to generate video using Gemini API
         
+        file_ids lists the uploaded session files in the order the model
+        should see them; without it the session files are used in upload order.
+        """
         jwt = await account.jwt_mgr.get()
         headers = get_common_headers(jwt)
         
-        model_id = Config.get_model_id(model)
-        
-        # Build request body matching Gemini Business API format exactly
-        body = {
-            "configId": account.config_id,
-            "additionalParams": {"token": "-"},
-            "streamAssistRequest": {
-                "session": session.name,
-                "query": {"parts": [{"text": prompt}]},
-                "filter": "",
-                "fileIds": [],
-                "answerGenerationMode": "NORMAL",
-                "toolsSpec": {
-                    "videoGenerationSpec": {},
-                },
-                "languageCode": "zh-CN",
-                "userMetadata": {"timeZone": "Etc/GMT-8"},
-                "assistSkippingMode": "REQUEST_ASSIST",
-            },
-        }
+        model_id = self._model_id_cache.get(model) or Config.get_model_id(model)
         
-        logger.info(f"Generating video with model {model_id}")
+        # Copy only the levels that get per-request values; the nested
+        # constant parts are shared with the template and never mutated
+        body = self._body_template.copy()
+        body["configId"] = account.config_id
+        sar = body["streamAssistRequest"] = body["streamAssistRequest"].copy()
+        sar["session"] = session.name
+        sar["query"] = {"parts": [{"text": prompt}]}
+        if file_ids:
+            sar["fileIds"] = list(file_ids)
         
-        from ..core.config import GeminiEndpoints
+        logger.info("Generating video with model %s", model_id)
         
         response = await self._http_client.post(
-            GeminiEndpoints.STREAM_ASSIST,
-            headers=headers,
-            json=body,
+            self._stream_assist_url,
+            headers=headers,  # Already carries content-type: application/json
+            content=_json_dumps(body),
             timeout=300.0,  # Video generation takes longer
         )
         
         if response.status_code != 200:
-            logger.error(f"Video generation failed: {response.status_code} {response.text}")
+            logger.error("Video generation failed: %s %s", response.status_code, response.text)
             if response.status_code in (401, 403, 429):
                 account.mark_quota_error(response.status_code, response.text)
             return VideoGenerationResult(success=False, error=f"API error: {response.status_code}")
         
         account.mark_success()
         
-        # Wait for video to be generated and available
-        await asyncio.sleep(3)
+        # Poll for the generated video, checking quickly at first and
+        # backing off while generation is still in progress
+        delay = VIDEO_POLL_INITIAL_DELAY
+        deadline = time.monotonic() + VIDEO_POLL_TIMEOUT_SECONDS
         
-        # List generated files
-        files = await self._session_manager.list_session_files(account, session)
-        
-        for f in files:
-            mime_type = f.get("mimeType", "")
-            if mime_type.startswith("video/"):
-                file_id = f.get("fileId")
-                video_data = await self._session_manager.download_file(
-                    account, session, file_id
-                )
-                
-                if video_data:
-                    return VideoGenerationResult(
-                        success=True,
-                        video_id=file_id,
-                        video_data=base64.b64encode(video_data).decode(),
-                        mime_type=mime_type,
-                        metadata={"file_info": f},
+        while True:
+            files = await self._session_manager.list_session_files(account, session)
+            
+            for f in files:
+                mime_type = f.get("mimeType", "")
+                if mime_type.startswith("video/"):
+                    file_id = f.get("fileId")
+                    video_data = await self._session_manager.download_file(
+                        account, session, file_id
                     )
+                    
+                    if video_data:
+                        return VideoGenerationResult(
+                            success=True,
+                            video_id=file_id,
+                            video_data=video_data,
+                            mime_type=mime_type,
+                            metadata={"file_info": f},
+                        )
+            
+            if time.monotonic() + delay > deadline:
+                break
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, VIDEO_POLL_MAX_DELAY)
         
         return VideoGenerationResult(
             success=False,
@@ -528,63 +768,32 @@ class VideoStudio:
     
     def _detect_image_mime(self, b64_data: str) -> str:
         """Detect image MIME type from base64 data"""
-        try:
-            # Check first few bytes after decoding
-            header = base64.b64decode(b64_data[:32])
-            
-            if header.startswith(b'\x89PNG'):
-                return "image/png"
-            elif header.startswith(b'\xff\xd8\xff'):
-                return "image/jpeg"
-            elif header.startswith(b'GIF8'):
-                return "image/gif"
-            elif header.startswith(b'RIFF') and b'WEBP' in header:
-                return "image/webp"
-        except:
-            pass
-        
-        return "image/jpeg"  # Default
+        # 16 base64 chars decode to the 12 bytes needed for RIFF....WEBP
+        return _detect_image_mime_cached(b64_data[:16])
     
     def _detect_video_mime(self, b64_data: str) -> str:
         """Detect video MIME type from base64 data"""
-        try:
-            header = base64.b64decode(b64_data[:32])
-            
-            if b'ftyp' in header:
-                return "video/mp4"
-            elif header.startswith(b'\x1a\x45\xdf\xa3'):
-                return "video/webm"
-        except:
-            pass
-        
-        return "video/mp4"  # Default
+        return _detect_video_mime_cached(b64_data[:32])
     
-    def _save_video(self, b64_data: str, mime_type: str) -> Path:
-        """Save video data to cache directory"""
+    async def _save_video(self, data: Union[bytes, str], mime_type: str) -> Path:
+        """Save video data (raw bytes or base64) to cache directory"""
         ext = "mp4"
         if "webm" in mime_type:
             ext = "webm"
         elif "quicktime" in mime_type or "mov" in mime_type:
             ext = "mov"
         
-        filename = f"video_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.{ext}"
+        filename = f"video_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{_short_id()}.{ext}"
         filepath = Config.VIDEO_SAVE_DIR / filename
         
-        video_bytes = base64.b64decode(b64_data)
-        with open(filepath, "wb") as f:
-            f.write(video_bytes)
+        # Disk writes run on a worker thread so they don't stall the event loop
+        await to_thread(_write_video_file, filepath, data)
         
-        logger.info(f"Video saved: {filepath}")
+        logger.info("Video saved: %s", filepath)
         return filepath
 
 
-# Global video studio instance
-_video_studio: Optional[VideoStudio] = None
-
-
+@lru_cache(maxsize=None)
 def get_video_studio() -> VideoStudio:
     """Get or create the global video studio instance"""
-    global _video_studio
-    if _video_studio is None:
-        _video_studio = VideoStudio()
-    return _video_studio
+    return VideoStudio()
@@ -5,19 +5,64 @@
 import os
 import sys
 import json
+import hashlib
 import time
 import re
+import logging
 import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional, Dict, List
+from urllib.parse import urlparse
+
+logger = logging.getLogger("cookie_refresh")
 
 # 配置文件路径
 CONFIG_FILE = Path(__file__).parent / "business_gemini_session.json"
+# 每个账号的浏览器 storage_state 保存目录
+COOKIE_STATE_DIR = CONFIG_FILE.parent / "cookie_states"
+# 上次完成刷新周期的时间戳（独立文件，避免为此重写整个配置）
+LAST_REFRESH_FILE = COOKIE_STATE_DIR / "last_refresh_time"
 
 # Cookie刷新配置
 COOKIE_REFRESH_INTERVAL = 3600  # 刷新间隔：1小时（秒）
-CHECK_INTERVAL = 60  # 检查间隔：1分钟（秒）
+CHECK_INTERVAL = 60  # 未启用自动刷新时的重新检查间隔：1分钟（秒）
+
+# 后台线程停止信号
+_stop = threading.Event()
+
+# 刷新后写回配置文件的账号字段；合并写入时串行化读-改-写
+ACCOUNT_COOKIE_FIELDS = ("secure_c_ses", "host_c_oses", "csesidx", "cookie_refresh_time")
+_EXPIRED_FIELDS = ("cookie_expired", "cookie_expired_time")
+_config_lock = threading.Lock()
+
+# 页面就绪判定：Cookie已写入或URL中已出现csesidx
+COOKIE_READY_JS = "() => document.cookie.includes('__Secure-C_SES') || /csesidx[=:]\\d+/.test(location.href)"
+COOKIE_READY_TIMEOUT = 10000  # 毫秒
+
+# 从URL中提取csesidx
+_CSESIDX_RE = re.compile(r'csesidx[=:](\d+)')
+
+# 浏览器启动参数与默认UA
+_BROWSER_ARGS = ('--no-sandbox', '--disable-setuid-sandbox') if os.name != 'nt' else ()
+_DEFAULT_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36'
+
+# Google登录页路径前缀（域名为 accounts.google.com）
+_LOGIN_HOST = "accounts.google.com"
+_LOGIN_PATHS = frozenset({"/v3/signin", "/ServiceLogin"})
+
+# 需要提取的会话Cookie及其优先域
+_SESSION_COOKIE_NAMES = frozenset({"__Secure-C_SES", "__Host-C_OSES"})
+_SESSION_COOKIE_DOMAINS = frozenset({"business.gemini.google", ".gemini.google"})
+
+# 刷新Cookie时不需要加载的资源类型
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
+# 启动浏览器前的Cookie有效性探测
+COOKIE_PROBE_URL = "https://business.gemini.google/auth/getoxsrf"
+COOKIE_PROBE_TIMEOUT = 5  # 秒
+COOKIE_MAX_SKIP_AGE = 6 * 3600  # 距上次浏览器刷新超过该时长则不再跳过，保证会话定期续期（秒）
 
 # Playwright可用性检测
 PLAYWRIGHT_AVAILABLE = False
@@ -29,44 +74,152 @@ try:
 except ImportError:
     pass
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+# Cookie探测复用的连接池；各账号Cookie通过请求头传入，会话本身不保存任何Cookie
+_probe_session = None
+if REQUESTS_AVAILABLE:
+    _probe_session = requests.Session()
+    _probe_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    _probe_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    _probe_session.mount("https://", _probe_adapter)
+    _probe_session.mount("http://", _probe_adapter)
+
+
+def _probe_playwright_browser() -> bool:
+    """检查Chromium可执行文件是否存在，无法获取路径时才回退为启动一次浏览器"""
+    with sync_playwright() as p:
+        try:
+            executable = p.chromium.executable_path
+        except Exception:
+            executable = None
+        if executable:
+            return os.path.exists(executable)
+        browser = p.chromium.launch(headless=True)
+        browser.close()
+        return True
+
 
 def check_playwright_browser() -> bool:
-    """检测Playwright浏览器是否已安装"""
+    """检测Playwright浏览器是否已安装（只缓存已安装的结果，安装后无需重启即可生效）"""
     global PLAYWRIGHT_BROWSER_INSTALLED
     if not PLAYWRIGHT_AVAILABLE:
         return False
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            browser.close()
-        PLAYWRIGHT_BROWSER_INSTALLED = True
+    if PLAYWRIGHT_BROWSER_INSTALLED:
         return True
+    try:
+        installed = _probe_playwright_browser()
     except Exception as e:
-        print(f"[Cookie刷新] Playwright浏览器未安装: {e}")
-        print("[Cookie刷新] 请运行: playwright install chromium")
+        logger.warning("Playwright浏览器未安装: %s", e)
+        logger.warning("请运行: playwright install chromium")
+        return False
+    if not installed:
+        logger.warning("Playwright浏览器未安装")
+        logger.warning("请运行: playwright install chromium")
         return False
+    PLAYWRIGHT_BROWSER_INSTALLED = True
+    return True
 
 
 def load_config() -> Optional[dict]:
     """加载配置文件"""
     if not CONFIG_FILE.exists():
-        print(f"[Cookie刷新] 配置文件不存在: {CONFIG_FILE}")
+        logger.warning("配置文件不存在: %s", CONFIG_FILE)
         return None
     try:
         with open(CONFIG_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception as e:
-        print(f"[Cookie刷新] 加载配置失败: {e}")
+        logger.error("加载配置失败: %s", e)
         return None
 
 
 def save_config(config: dict):
-    """保存配置到文件"""
+    """保存配置到文件（先写临时文件再原子替换，避免写一半损坏配置）"""
+    tmp_file = CONFIG_FILE.with_name(CONFIG_FILE.name + ".tmp")
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        # 与 gemini.py 的 AccountManager.save_config 保持同样的 4 空格缩进，
+        # 这个文件会被手工编辑，格式不应随写入方变化
+        data = json.dumps(config, indent=4, ensure_ascii=False).encode("utf-8")
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, CONFIG_FILE)
     except Exception as e:
-        print(f"[Cookie刷新] 保存配置失败: {e}")
+        logger.error("保存配置失败: %s", e)
+
+
+def account_key(account: dict) -> str:
+    """账号的稳定标识（team_id + csesidx 的哈希），不随账号在列表中的位置变化"""
+    raw = f'{account.get("team_id", "")}:{account.get("csesidx", "")}'
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def cookie_fields(account: dict) -> Dict[str, str]:
+    """取出刷新后需要写回配置的Cookie字段"""
+    return {f: account.get(f, "") for f in ACCOUNT_COOKIE_FIELDS}
+
+
+def apply_cookie_fields(account: dict, fields: Dict[str, str]):
+    """把刷新得到的Cookie字段写入账号并清除过期标记"""
+    account.update(fields)
+    for key in _EXPIRED_FIELDS:
+        account.pop(key, None)
+
+
+def merge_into_config(updates: Dict[str, dict]) -> bool:
+    """
+    重新读取配置文件，只把刷新过的账号Cookie字段合并进去后保存
+    避免用刷新开始时的旧配置覆盖期间其他进程/线程对配置的修改
+    updates: {刷新前的 account_key: 新的Cookie字段}
+    """
+    if not updates:
+        return False
+    with _config_lock:
+        config = load_config()
+        if not config:
+            return False
+        merged = 0
+        for acc in config.get("accounts", []):
+            fields = updates.get(account_key(acc))
+            if fields is None:
+                continue
+            apply_cookie_fields(acc, fields)
+            merged += 1
+        if not merged:
+            return False
+        save_config(config)
+    return True
+
+
+def _write_private_file(path: Path, data: bytes):
+    """以 0600 权限原子写入 COOKIE_STATE_DIR 下的文件（目录为 0700）"""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp_file = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+
+def load_last_refresh_time() -> float:
+    """读取上次刷新周期的时间戳，没有记录时返回0"""
+    try:
+        return float(LAST_REFRESH_FILE.read_text(encoding="utf-8").strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def save_last_refresh_time(timestamp: float):
+    """记录刷新周期完成时间"""
+    try:
+        _write_private_file(LAST_REFRESH_FILE, str(timestamp).encode("utf-8"))
+    except OSError as e:
+        logger.warning("保存刷新时间失败: %s", e)
 
 
 def get_proxy() -> Optional[str]:
@@ -77,13 +230,17 @@ def get_proxy() -> Optional[str]:
     return None
 
 
-def refresh_cookie_with_browser(account: dict, proxy: Optional[str] = None) -> Optional[Dict[str, str]]:
+def refresh_cookie_with_browser(account: dict, proxy: Optional[str] = None,
+                                pw=None, browser=None,
+                                state_path: Optional[Path] = None) -> Optional[Dict[str, str]]:
     """
     使用 Playwright 自动化浏览器刷新 Cookie
+    传入 browser 时直接复用；只传入 pw 时用它启动浏览器；都不传则自行启动 Playwright
+    state_path 为该账号持久化的 storage_state 文件
     返回: {"secure_c_ses": "...", "host_c_oses": "...", "csesidx": "..."} 或 None
     """
     if not PLAYWRIGHT_AVAILABLE:
-        print("[Cookie刷新] Playwright 未安装，无法自动刷新 Cookie")
+        logger.warning("Playwright 未安装，无法自动刷新 Cookie")
         return None
 
     if not PLAYWRIGHT_BROWSER_INSTALLED:
@@ -91,316 +248,531 @@ def refresh_cookie_with_browser(account: dict, proxy: Optional[str] = None) -> O
             return None
 
     try:
+        if browser is not None:
+            return _refresh_in_context(browser, account, proxy, state_path)
+        if pw is not None:
+            return _refresh_with_new_browser(pw, account, proxy, state_path)
         with sync_playwright() as p:
-            # 启动浏览器
-            browser_args = ['--no-sandbox', '--disable-setuid-sandbox'] if os.name != 'nt' else []
+            return _refresh_with_new_browser(p, account, proxy, state_path)
+
+    except Exception as e:
+        logger.error("发生错误: %s", e)
+        return None
+
+
+def _refresh_with_new_browser(p, account: dict, proxy: Optional[str] = None,
+                              state_path: Optional[Path] = None) -> Optional[Dict[str, str]]:
+    """用给定的 Playwright 实例启动一次性浏览器刷新单个账号"""
+    browser = _launch_browser(p)
+    if not browser:
+        return None
+    try:
+        return _refresh_in_context(browser, account, proxy, state_path)
+    finally:
+        try:
+            browser.close()
+        except:
+            pass
+
+
+def _launch_browser(p):
+    """启动无头Chromium，失败返回None"""
+    try:
+        return p.chromium.launch(headless=True, args=_BROWSER_ARGS)
+    except Exception as e:
+        error_msg = str(e)
+        if "Executable doesn't exist" in error_msg:
+            logger.warning("Playwright 浏览器未安装，请运行: playwright install chromium")
+        else:
+            logger.error("启动浏览器失败: %s", error_msg)
+        return None
+
+
+class _SharedPlaywright:
+    """后台线程长期持有的 Playwright 驱动；浏览器启动失败时重启驱动进程再试一次"""
+
+    def __init__(self):
+        self._pw = sync_playwright().start()
+
+    def launch_browser(self):
+        browser = _launch_browser(self._pw) if self._pw is not None else None
+        if browser is None:
+            logger.warning("浏览器启动失败，重启Playwright驱动后重试")
+            self.restart()
+            if self._pw is not None:
+                browser = _launch_browser(self._pw)
+        return browser
+
+    def restart(self):
+        self.stop()
+        try:
+            self._pw = sync_playwright().start()
+        except Exception as e:
+            logger.error("重启Playwright失败: %s", e)
+
+    def stop(self):
+        if self._pw is None:
+            return
+        try:
+            self._pw.stop()
+        except:
+            pass
+        self._pw = None
+
+
+def _is_login(url: str) -> bool:
+    """判断URL是否为Google登录页（只看域名和路径，忽略查询参数）"""
+    parsed = urlparse(url)
+    return parsed.netloc == _LOGIN_HOST and any(parsed.path.startswith(p) for p in _LOGIN_PATHS)
+
+
+def _block_heavy_resources(route):
+    """拦截与Cookie无关的静态资源，减少页面加载流量"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _get_session_cookies(context, page) -> Dict[str, str]:
+    """
+    通过 CDP Network.getAllCookies 读取会话Cookie，不可用时退回 context.cookies()
+    同名Cookie以 business.gemini.google / .gemini.google 域下的为准
+    """
+    try:
+        client = context.new_cdp_session(page)
+        try:
+            cookies = client.send("Network.getAllCookies")["cookies"]
+        finally:
+            client.detach()
+    except Exception:
+        cookies = context.cookies()
+
+    cookies = sorted(cookies, key=lambda c: c.get('domain', '') in _SESSION_COOKIE_DOMAINS)
+    return {c['name']: c['value'] for c in cookies if c['name'] in _SESSION_COOKIE_NAMES}
+
+
+def _storage_state_path(account: dict) -> Path:
+    """账号对应的浏览器 storage_state 文件路径（按 account_key 命名，与列表顺序无关）"""
+    return COOKIE_STATE_DIR / f"state_{account_key(account)}.json"
+
+
+def remove_storage_state(account: dict):
+    """删除账号保存的浏览器状态（删除账号时调用）"""
+    try:
+        _storage_state_path(account).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("删除浏览器状态失败: %s", e)
+
+
+def prune_storage_states(accounts: List[dict]):
+    """清理已不属于任何账号的浏览器状态文件"""
+    keep = {_storage_state_path(acc).name for acc in accounts}
+    for path in COOKIE_STATE_DIR.glob("state_*.json"):
+        if path.name not in keep:
             try:
-                browser = p.chromium.launch(headless=True, args=browser_args)
-            except Exception as e:
-                error_msg = str(e)
-                if "Executable doesn't exist" in error_msg:
-                    print("[Cookie刷新] Playwright 浏览器未安装，请运行: playwright install chromium")
-                else:
-                    print(f"[Cookie刷新] 启动浏览器失败: {error_msg}")
-                return None
+                path.unlink()
+            except OSError as e:
+                logger.warning("删除浏览器状态失败: %s", e)
 
-            # 获取现有 Cookie
-            existing_secure_c_ses = account.get("secure_c_ses")
-            existing_host_c_oses = account.get("host_c_oses")
 
-            # 创建浏览器上下文
-            context_options = {
-                "user_agent": account.get('user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36'),
-                "viewport": {"width": 1920, "height": 1080}
-            }
+def _refresh_in_context(browser, account: dict, proxy: Optional[str] = None,
+                        state_path: Optional[Path] = None) -> Optional[Dict[str, str]]:
+    """
+    在已启动的浏览器中新建独立上下文刷新单个账号的 Cookie
+    传入 state_path 时用上次保存的 storage_state 初始化上下文，刷新成功后写回
+    返回: {"secure_c_ses": "...", "host_c_oses": "...", "csesidx": "..."} 或 None
+    """
+    # 获取现有 Cookie
+    existing_secure_c_ses = account.get("secure_c_ses")
+    existing_host_c_oses = account.get("host_c_oses")
+
+    # 创建浏览器上下文
+    context_options = {
+        "user_agent": account.get('user_agent', _DEFAULT_UA),
+        "viewport": {"width": 1920, "height": 1080}
+    }
 
-            # 设置现有Cookie以保持登录状态
-            # 注意: __Host- 前缀的Cookie不能设置domain，必须是当前域
-            # 所以我们不在context创建时设置cookie，而是在页面加载后通过context.add_cookies设置
+    if proxy:
+        context_options["proxy"] = {"server": proxy}
 
-            if proxy:
-                context_options["proxy"] = {"server": proxy}
+    # 复用上次保存的浏览器状态（包含Google侧的其他会话Cookie）
+    if state_path is not None and state_path.exists():
+        context_options["storage_state"] = str(state_path)
 
-            context = browser.new_context(**context_options)
-            page = context.new_page()
+    context = browser.new_context(**context_options)
+    context.route("**/*", _block_heavy_resources)
+    page = context.new_page()
 
+    try:
+        # 导航前设置现有Cookie以保持登录状态，配置中的值优先于 storage_state
+        # 注意: __Host- 前缀的Cookie不能设置domain，因此使用url方式
+        if existing_secure_c_ses:
+            cookies_to_add = [{
+                "name": "__Secure-C_SES",
+                "value": existing_secure_c_ses,
+                "url": "https://business.gemini.google/",
+                "secure": True,
+                "sameSite": "None"
+            }]
+            if existing_host_c_oses:
+                cookies_to_add.append({
+                    "name": "__Host-C_OSES",
+                    "value": existing_host_c_oses,
+                    "url": "https://business.gemini.google/",
+                    "secure": True,
+                    "sameSite": "Strict"
+                })
             try:
-                # 先访问目标域名以便设置Cookie
-                print(f"[Cookie刷新] 正在访问 business.gemini.google ...")
-                page.goto("https://business.gemini.google/", wait_until="domcontentloaded", timeout=30000)
-                
-                # 在当前域设置Cookie (使用url方式)
-                if existing_secure_c_ses:
-                    cookies_to_add = [{
-                        "name": "__Secure-C_SES",
-                        "value": existing_secure_c_ses,
-                        "url": "https://business.gemini.google/",
-                        "secure": True,
-                        "sameSite": "None"
-                    }]
-                    if existing_host_c_oses:
-                        cookies_to_add.append({
-                            "name": "__Host-C_OSES",
-                            "value": existing_host_c_oses,
-                            "url": "https://business.gemini.google/",
-                            "secure": True,
-                            "sameSite": "Strict"
-                        })
-                    try:
-                        context.add_cookies(cookies_to_add)
-                        print(f"[Cookie刷新] Cookie已设置，刷新页面...")
-                    except Exception as e:
-                        print(f"[Cookie刷新] 设置Cookie失败: {e}")
-                
-                # 刷新页面使Cookie生效
-                page.reload(wait_until="networkidle", timeout=60000)
-                page.wait_for_timeout(5000)
-
-                # 等待页面加载
-                try:
-                    page.wait_for_selector("body", timeout=10000)
-                except:
-                    pass
-                page.wait_for_timeout(3000)
-
-                # 检查是否在登录页面
-                current_url = page.url
-                print(f"[Cookie刷新] 当前页面URL: {current_url}")
-                
-                is_login_page = (
-                    "accounts.google.com/v3/signin" in current_url or
-                    "accounts.google.com/ServiceLogin" in current_url
-                )
+                context.add_cookies(cookies_to_add)
+            except Exception as e:
+                logger.warning("设置Cookie失败: %s", e)
+        
+        logger.debug("正在访问 business.gemini.google ...")
+        page.goto("https://business.gemini.google/", wait_until="load", timeout=30000)
 
-                if is_login_page:
-                    print(f"[Cookie刷新] 检测到Google登录页面，等待自动跳转...")
-                    # 等待自动登录跳转
-                    try:
-                        page.wait_for_timeout(5000)
-                        current_url = page.url
-                        print(f"[Cookie刷新] 等待后URL: {current_url}")
-                        # 重新判断是否还在登录页
-                        is_login_page = (
-                            "accounts.google.com/v3/signin" in current_url or
-                            "accounts.google.com/ServiceLogin" in current_url
-                        )
-                    except:
-                        pass
-
-                # 尝试触发Cookie刷新
-                try:
-                    page.evaluate("""
-                        () => {
-                            fetch('https://business.gemini.google/', { 
-                                method: 'GET',
-                                credentials: 'include'
-                            }).catch(() => {});
-                        }
-                    """)
-                    page.wait_for_timeout(2000)
-                except:
-                    pass
+        # 等待Cookie或csesidx就绪，超时则继续走后面的回退提取
+        try:
+            page.wait_for_function(COOKIE_READY_JS, timeout=COOKIE_READY_TIMEOUT)
+        except PlaywrightTimeoutError:
+            pass
+
+        # 检查是否在登录页面
+        current_url = page.url
+        logger.debug("当前页面URL: %s", current_url)
+        
+        is_login_page = _is_login(current_url)
 
-                # 提取csesidx
+        if is_login_page:
+            logger.debug("检测到Google登录页面，等待自动跳转...")
+            # 等待自动登录跳转
+            try:
+                page.wait_for_url(
+                    lambda url: not _is_login(url),
+                    wait_until="load",
+                    timeout=5000
+                )
+            except PlaywrightTimeoutError:
+                pass
+            try:
                 current_url = page.url
-                csesidx = None
-                
-                match = re.search(r'csesidx[=:](\\d+)', current_url)
-                if match:
-                    csesidx = match.group(1)
-
-                if not csesidx:
-                    try:
-                        csesidx = page.evaluate("""
-                            () => {
-                                const urlParams = new URLSearchParams(window.location.search);
-                                let csesidx = urlParams.get('csesidx');
-                                if (!csesidx) {
-                                    const match = window.location.href.match(/csesidx[=:](\\d+)/);
-                                    if (match) csesidx = match[1];
-                                }
-                                if (!csesidx) {
-                                    try {
-                                        csesidx = localStorage.getItem('csesidx') || 
-                                                 localStorage.getItem('CSESIDX');
-                                    } catch (e) {}
-                                }
-                                return csesidx;
-                            }
-                        """)
-                    except:
-                        pass
-
-                # 获取所有Cookie
-                all_cookies = context.cookies()
-                secure_c_ses = None
-                host_c_oses = None
-
-                for cookie in all_cookies:
-                    cookie_name = cookie['name']
-                    cookie_domain = cookie.get('domain', '')
-                    
-                    if cookie_name == '__Secure-C_SES':
-                        if not secure_c_ses or cookie_domain in ['business.gemini.google', '.gemini.google']:
-                            secure_c_ses = cookie['value']
-                    elif cookie_name == '__Host-C_OSES':
-                        if not host_c_oses or cookie_domain == 'business.gemini.google':
-                            host_c_oses = cookie['value']
-
-                # 尝试从document.cookie获取
-                if not secure_c_ses:
-                    try:
-                        page_cookies = page.evaluate("() => document.cookie")
-                        if page_cookies:
-                            for cookie_str in page_cookies.split(';'):
-                                cookie_str = cookie_str.strip()
-                                if cookie_str.startswith('__Secure-C_SES='):
-                                    secure_c_ses = cookie_str.split('=', 1)[1]
-                                elif cookie_str.startswith('__Host-C_OSES='):
-                                    host_c_oses = cookie_str.split('=', 1)[1]
-                    except:
-                        pass
-
-                if not secure_c_ses:
-                    print("[Cookie刷新] 未找到 __Secure-C_SES Cookie")
-                    if is_login_page:
-                        print("[Cookie刷新] Cookie已过期，需要手动登录刷新")
-                    return None
-
-                # 使用现有csesidx作为回退
-                if not csesidx:
-                    csesidx = account.get("csesidx")
-                    if not csesidx:
-                        print("[Cookie刷新] 未找到 csesidx")
-                        return None
-
-                # 检查Cookie是否更新
-                cookie_changed = secure_c_ses != existing_secure_c_ses
-                
-                # 只有在真正的Google登录页且完全没获取到新Cookie时才判定失败
-                if is_login_page and not secure_c_ses:
-                    print("[Cookie刷新] 在登录页且未获取到Cookie，Cookie可能已失效")
-                    return None
-                
-                if cookie_changed:
-                    print(f"[Cookie刷新] Cookie已更新")
-                else:
-                    print(f"[Cookie刷新] Cookie值未变化（可能只是续期）")
+                logger.debug("等待后URL: %s", current_url)
+                # 重新判断是否还在登录页
+                is_login_page = _is_login(current_url)
+            except:
+                pass
 
-                return {
-                    "secure_c_ses": secure_c_ses,
-                    "host_c_oses": host_c_oses or account.get("host_c_oses", ""),
-                    "csesidx": csesidx
+        # 尝试触发Cookie刷新；返回 fetch 的 Promise，让 evaluate 等请求完成后再读取Cookie
+        try:
+            page.evaluate("""
+                () => {
+                    const controller = new AbortController();
+                    setTimeout(() => controller.abort(), 5000);
+                    return fetch('https://business.gemini.google/', { 
+                        method: 'GET',
+                        credentials: 'include',
+                        signal: controller.signal
+                    }).then(() => true).catch(() => false);
                 }
+            """)
+        except:
+            pass
 
-            except PlaywrightTimeoutError:
-                print("[Cookie刷新] 页面加载超时")
+        # 提取csesidx
+        current_url = page.url
+        csesidx = None
+        
+        match = _CSESIDX_RE.search(current_url)
+        if match:
+            csesidx = match.group(1)
+
+        if not csesidx:
+            try:
+                csesidx = page.evaluate("""
+                    () => {
+                        const urlParams = new URLSearchParams(window.location.search);
+                        let csesidx = urlParams.get('csesidx');
+                        if (!csesidx) {
+                            const match = window.location.href.match(/csesidx[=:](\\d+)/);
+                            if (match) csesidx = match[1];
+                        }
+                        if (!csesidx) {
+                            try {
+                                csesidx = localStorage.getItem('csesidx') || 
+                                         localStorage.getItem('CSESIDX');
+                            } catch (e) {}
+                        }
+                        return csesidx;
+                    }
+                """)
+            except:
+                pass
+
+        # 获取所有Cookie（CDP一次取回，包含HttpOnly Cookie）
+        session_cookies = _get_session_cookies(context, page)
+        secure_c_ses = session_cookies.get('__Secure-C_SES')
+        host_c_oses = session_cookies.get('__Host-C_OSES')
+
+        if not secure_c_ses:
+            logger.warning("未找到 __Secure-C_SES Cookie")
+            if is_login_page:
+                logger.warning("Cookie已过期，需要手动登录刷新")
+            return None
+
+        # 使用现有csesidx作为回退
+        if not csesidx:
+            csesidx = account.get("csesidx")
+            if not csesidx:
+                logger.warning("未找到 csesidx")
                 return None
+
+        # 检查Cookie是否更新
+        cookie_changed = secure_c_ses != existing_secure_c_ses
+        
+        # 只有在真正的Google登录页且完全没获取到新Cookie时才判定失败
+        if is_login_page and not secure_c_ses:
+            logger.warning("在登录页且未获取到Cookie，Cookie可能已失效")
+            return None
+        
+        if cookie_changed:
+            logger.info("Cookie已更新")
+        else:
+            logger.info("Cookie值未变化（可能只是续期）")
+
+        if state_path is not None:
+            try:
+                state = context.storage_state()
+                _write_private_file(state_path, json.dumps(state).encode("utf-8"))
             except Exception as e:
-                print(f"[Cookie刷新] 刷新失败: {e}")
-                return None
-            finally:
-                try:
-                    context.close()
-                    browser.close()
-                except:
-                    pass
+                logger.warning("保存浏览器状态失败: %s", e)
 
+        return {
+            "secure_c_ses": secure_c_ses,
+            "host_c_oses": host_c_oses or account.get("host_c_oses", ""),
+            "csesidx": csesidx
+        }
+
+    except PlaywrightTimeoutError:
+        logger.warning("页面加载超时")
+        return None
     except Exception as e:
-        print(f"[Cookie刷新] 发生错误: {e}")
+        logger.error("刷新失败: %s", e)
         return None
+    finally:
+        try:
+            context.close()
+        except:
+            pass
 
 
-def refresh_account_cookie(account_idx: int, account: dict, proxy: Optional[str] = None) -> bool:
+def refresh_account_cookie(config: dict, account_idx: int, proxy: Optional[str] = None, browser=None) -> bool:
     """
-    刷新指定账号的Cookie并更新配置
+    刷新指定账号的Cookie并直接更新传入的配置（不写文件，由调用方负责保存）
+    传入 browser 时复用已启动的浏览器，只为该账号新建上下文
     返回: True成功, False失败
     """
-    print(f"[Cookie刷新] 开始刷新账号 {account_idx} 的Cookie...")
+    accounts = config.get("accounts", [])
+    if not 0 <= account_idx < len(accounts):
+        logger.warning("账号 %s 不存在", account_idx)
+        return False
+    account = accounts[account_idx]
+
+    logger.info("开始刷新账号 %s 的Cookie...", account_idx)
     
-    cookies = refresh_cookie_with_browser(account, proxy)
+    state_path = _storage_state_path(account)
+    cookies = refresh_cookie_with_browser(
+        account, proxy, browser=browser, state_path=state_path
+    )
     
     if not cookies:
-        print(f"[Cookie刷新] 账号 {account_idx}: 刷新失败")
-        return False
-
-    # 加载最新配置
-    config = load_config()
-    if not config:
-        return False
-
-    accounts = config.get("accounts", [])
-    if account_idx >= len(accounts):
-        print(f"[Cookie刷新] 账号 {account_idx} 不存在")
+        logger.warning("账号 %s: 刷新失败", account_idx)
         return False
 
     # 更新Cookie
-    old_ses = accounts[account_idx].get("secure_c_ses", "")
-    accounts[account_idx]["secure_c_ses"] = cookies["secure_c_ses"]
-    accounts[account_idx]["host_c_oses"] = cookies.get("host_c_oses", "")
-    accounts[account_idx]["csesidx"] = cookies.get("csesidx", "")
-    accounts[account_idx]["cookie_refresh_time"] = datetime.now().isoformat()
+    old_ses = account.get("secure_c_ses", "")
+    account["secure_c_ses"] = cookies["secure_c_ses"]
+    account["host_c_oses"] = cookies.get("host_c_oses", "")
+    account["csesidx"] = cookies.get("csesidx", "")
+    account["cookie_refresh_time"] = datetime.now().isoformat()
     
     # 清除过期标记
-    accounts[account_idx].pop("cookie_expired", None)
-    accounts[account_idx].pop("cookie_expired_time", None)
-    
-    config["accounts"] = accounts
-    save_config(config)
+    account.pop("cookie_expired", None)
+    account.pop("cookie_expired_time", None)
+
+    # csesidx 变化后账号标识随之变化，浏览器状态文件跟着改名
+    new_state_path = _storage_state_path(account)
+    if new_state_path != state_path and state_path.exists():
+        try:
+            os.replace(state_path, new_state_path)
+        except OSError as e:
+            logger.warning("重命名浏览器状态失败: %s", e)
 
     cookie_changed = old_ses != cookies["secure_c_ses"]
     if cookie_changed:
-        print(f"[✓] 账号 {account_idx} Cookie已刷新 (csesidx: {cookies.get('csesidx', 'N/A')[:10]}...)")
+        logger.info("[✓] 账号 %s Cookie已刷新 (csesidx: %s...)", account_idx, cookies.get('csesidx', 'N/A')[:10])
     else:
-        print(f"[✓] 账号 {account_idx} Cookie已验证 (值未变化)")
+        logger.info("[✓] 账号 %s Cookie已验证 (值未变化)", account_idx)
 
     return True
 
 
-def cookie_refresh_worker():
+def cookie_still_valid(account: dict, proxy: Optional[str] = None) -> bool:
+    """
+    不启动浏览器，直接用现有Cookie请求 getoxsrf 判断会话是否仍然有效
+    距上次刷新过久、探测失败或请求异常时一律返回 False（需要走浏览器刷新）
+    """
+    if not REQUESTS_AVAILABLE:
+        return False
+
+    refresh_time = account.get("cookie_refresh_time")
+    if not refresh_time:
+        return False
+    try:
+        age = (datetime.now() - datetime.fromisoformat(refresh_time)).total_seconds()
+    except (TypeError, ValueError):
+        return False
+    if age >= COOKIE_MAX_SKIP_AGE:
+        return False
+
+    headers = {
+        "accept": "*/*",
+        "user-agent": account.get('user_agent', _DEFAULT_UA),
+        "cookie": f'__Secure-C_SES={account.get("secure_c_ses", "")}; __Host-C_OSES={account.get("host_c_oses", "")}',
+    }
+    proxies = {"http": proxy, "https": proxy} if proxy else None
+    try:
+        resp = _probe_session.get(
+            COOKIE_PROBE_URL,
+            params={"csesidx": account.get("csesidx")},
+            headers=headers,
+            proxies=proxies,
+            timeout=COOKIE_PROBE_TIMEOUT,
+            allow_redirects=False
+        )
+    except requests.RequestException:
+        return False
+    return resp.status_code == 200 and "xsrfToken" in resp.text
+
+
+def refresh_accounts(config: dict, targets: List[int], proxy: Optional[str] = None,
+                     skip_valid: bool = False, pw=None) -> int:
+    """
+    在同一个浏览器进程中依次刷新多个账号，每个账号使用独立上下文
+    skip_valid=True 时先探测现有Cookie，仍有效的账号不启动浏览器
+    传入 pw（Playwright 实例或 _SharedPlaywright）时复用调用方的驱动，否则本次临时启动
+    刷新成功的账号按 account_key 合并写回配置文件（重新读取后再保存）
+    返回: 成功数量（含探测仍有效而跳过的账号）
+    """
+    success_count = 0
+    if skip_valid:
+        accounts = config.get("accounts", [])
+        pending = []
+        for idx in targets:
+            if cookie_still_valid(accounts[idx], proxy):
+                logger.info("账号 %s: Cookie仍有效，跳过", idx)
+                success_count += 1
+            else:
+                pending.append(idx)
+        targets = pending
+
+    if not targets:
+        return success_count
+
+    updates = {}
+    try:
+        if pw is not None:
+            _refresh_batch(pw, config, targets, proxy, updates)
+        else:
+            with sync_playwright() as p:
+                _refresh_batch(p, config, targets, proxy, updates)
+    except Exception as e:
+        logger.error("发生错误: %s", e)
+
+    if updates:
+        merge_into_config(updates)
+    return success_count + len(updates)
+
+
+def _refresh_batch(p, config: dict, targets: List[int], proxy: Optional[str],
+                   updates: Dict[str, dict]):
+    """启动一个浏览器依次刷新 targets 中的账号，成功的账号字段按刷新前的 account_key 记入 updates"""
+    browser = p.launch_browser() if isinstance(p, _SharedPlaywright) else _launch_browser(p)
+    if not browser:
+        return
+    accounts = config.get("accounts", [])
+    try:
+        for idx in targets:
+            key = account_key(accounts[idx])
+            if refresh_account_cookie(config, idx, proxy, browser=browser):
+                updates[key] = cookie_fields(accounts[idx])
+    finally:
+        try:
+            browser.close()
+        except:
+            pass
+
+
+def cookie_refresh_worker(initial_config: Optional[dict] = None):
     """
     后台Cookie刷新工作线程
-    每小时刷新所有账号的Cookie
+    每小时刷新所有账号的Cookie；initial_config 为启动时已加载的配置，首轮直接使用
     """
     if not PLAYWRIGHT_AVAILABLE:
-        print("[Cookie刷新] Playwright未安装，自动刷新已禁用")
-        print("[Cookie刷新] 安装方法: pip install playwright && playwright install chromium")
+        logger.warning("Playwright未安装，自动刷新已禁用")
+        logger.warning("安装方法: pip install playwright && playwright install chromium")
         return
 
     # 等待主程序启动
-    time.sleep(5)
+    if _stop.wait(5):
+        return
 
     # 检测浏览器
     if not check_playwright_browser():
-        print("[Cookie刷新] Playwright浏览器未安装，自动刷新已禁用")
+        logger.warning("Playwright浏览器未安装，自动刷新已禁用")
         return
 
-    print(f"[Cookie刷新] 后台刷新线程已启动，刷新间隔: {COOKIE_REFRESH_INTERVAL // 60} 分钟")
+    logger.info("后台刷新线程已启动，刷新间隔: %s 分钟", COOKIE_REFRESH_INTERVAL // 60)
 
-    last_refresh_time = 0  # 首次立即刷新
+    # 恢复上次刷新时间，重启后不必立即重刷；没有记录时首次立即刷新
+    # 时钟回拨或写坏导致记录在未来时按当前时间算，等待不会超过刷新间隔
+    last_refresh_time = min(load_last_refresh_time(), time.time())
 
-    while True:
-        try:
-            current_time = time.time()
-            
-            # 检查是否到达刷新时间
-            if current_time - last_refresh_time >= COOKIE_REFRESH_INTERVAL:
-                config = load_config()
-                if not config:
-                    time.sleep(CHECK_INTERVAL)
-                    continue
+    # 整个线程生命周期共用一个 Playwright 驱动进程
+    try:
+        pw = _SharedPlaywright()
+    except Exception as e:
+        logger.error("启动Playwright失败: %s", e)
+        return
 
-                # 检查是否启用自动刷新
-                if not config.get("auto_refresh_cookie", False):
-                    time.sleep(CHECK_INTERVAL)
+    try:
+        while True:
+            try:
+                # 睡到下一次刷新时间点，期间收到停止信号立即退出
+                timeout = max(0, (last_refresh_time + COOKIE_REFRESH_INTERVAL) - time.time())
+                if timeout > 0:
+                    initial_config = None  # 睡眠后启动时的配置已过期
+                if _stop.wait(timeout):
+                    break
+
+                current_time = time.time()
+                config = initial_config or load_config()
+                initial_config = None
+
+                # 配置缺失或未启用自动刷新时，按检查间隔重试
+                if not config or not config.get("auto_refresh_cookie", False):
+                    if _stop.wait(CHECK_INTERVAL):
+                        break
                     continue
 
                 accounts = config.get("accounts", [])
                 proxy = config.get("proxy")
+                prune_storage_states(accounts)
 
-                print(f"[Cookie刷新] 开始刷新 {len(accounts)} 个账号的Cookie...")
+                logger.info("开始刷新 %s 个账号的Cookie...", len(accounts))
 
-                success_count = 0
+                targets = []
                 for idx, acc in enumerate(accounts):
                     # 跳过禁用的账号
                     if not acc.get("available", True):
@@ -408,26 +780,45 @@ def cookie_refresh_worker():
                     
                     # 检查是否有有效的Cookie
                     if not acc.get("secure_c_ses") or not acc.get("csesidx"):
-                        print(f"[Cookie刷新] 账号 {idx}: 缺少Cookie，跳过")
+                        logger.info("账号 %s: 缺少Cookie，跳过", idx)
                         continue
 
-                    if refresh_account_cookie(idx, acc, proxy):
-                        success_count += 1
-                    
-                    # 账号间间隔，避免请求过快
-                    time.sleep(5)
+                    targets.append(idx)
 
-                print(f"[Cookie刷新] 刷新完成: {success_count}/{len(accounts)} 成功")
+                success_count = refresh_accounts(config, targets, proxy, skip_valid=True, pw=pw)
+                logger.info("刷新完成: %s/%s 成功", success_count, len(accounts))
                 last_refresh_time = current_time
+                save_last_refresh_time(current_time)
 
-            time.sleep(CHECK_INTERVAL)
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                logger.error("线程错误: %s", e)
+                if _stop.wait(60):
+                    break
+    finally:
+        pw.stop()
 
-        except KeyboardInterrupt:
-            print("[Cookie刷新] 线程已停止")
-            break
-        except Exception as e:
-            print(f"[Cookie刷新] 线程错误: {e}")
-            time.sleep(60)
+    logger.info("线程已停止")
+
+
+def setup_logging(level=None):
+    """
+    设置本模块日志级别，未配置过日志处理器时挂一个输出到控制台的 StreamHandler
+    level 可为级别名或数值，默认读取 LOG_LEVEL 环境变量（与 gemini.py 一致）
+    """
+    if level is None:
+        level = os.getenv("LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    logger.setLevel(level)
+    if logger.handlers or logging.getLogger().handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("[Cookie刷新] %(message)s"))
+    logger.addHandler(handler)
 
 
 def start_cookie_refresh_thread() -> Optional[threading.Thread]:
@@ -437,18 +828,24 @@ def start_cookie_refresh_thread() -> Optional[threading.Thread]:
         return None
 
     if not config.get("auto_refresh_cookie", False):
-        print("[Cookie刷新] 自动刷新未启用 (在配置中设置 auto_refresh_cookie: true 启用)")
+        logger.info("自动刷新未启用 (在配置中设置 auto_refresh_cookie: true 启用)")
         return None
 
-    thread = threading.Thread(target=cookie_refresh_worker, daemon=True)
+    _stop.clear()
+    thread = threading.Thread(target=cookie_refresh_worker, args=(config,), daemon=True)
     thread.start()
     return thread
 
 
+def stop_cookie_refresh_thread():
+    """通知后台刷新线程退出（当前刷新周期结束后生效）"""
+    _stop.set()
+
+
 def manual_refresh_all():
     """手动刷新所有账号的Cookie"""
     if not PLAYWRIGHT_AVAILABLE:
-        print("[Cookie刷新] Playwright未安装")
+        logger.warning("Playwright未安装")
         return
 
     if not check_playwright_browser():
@@ -461,21 +858,22 @@ def manual_refresh_all():
     accounts = config.get("accounts", [])
     proxy = config.get("proxy")
 
-    print(f"[Cookie刷新] 开始手动刷新 {len(accounts)} 个账号...")
+    logger.info("开始手动刷新 %s 个账号...", len(accounts))
 
+    targets = []
     for idx, acc in enumerate(accounts):
         if not acc.get("available", True):
-            print(f"[Cookie刷新] 账号 {idx}: 已禁用，跳过")
+            logger.info("账号 %s: 已禁用，跳过", idx)
             continue
         
         if not acc.get("secure_c_ses") or not acc.get("csesidx"):
-            print(f"[Cookie刷新] 账号 {idx}: 缺少Cookie，跳过")
+            logger.info("账号 %s: 缺少Cookie，跳过", idx)
             continue
 
-        refresh_account_cookie(idx, acc, proxy)
-        time.sleep(3)
+        targets.append(idx)
 
-    print("[Cookie刷新] 手动刷新完成")
+    refresh_accounts(config, targets, proxy)
+    logger.info("手动刷新完成")
 
 
 if __name__ == "__main__":
@@ -487,13 +885,17 @@ if __name__ == "__main__":
     parser.add_argument("--account", type=int, help="只刷新指定账号")
     args = parser.parse_args()
 
+    setup_logging()
+
     if args.once:
         if args.account is not None:
             config = load_config()
             if config:
                 accounts = config.get("accounts", [])
                 if 0 <= args.account < len(accounts):
-                    refresh_account_cookie(args.account, accounts[args.account], config.get("proxy"))
+                    key = account_key(accounts[args.account])
+                    if refresh_account_cookie(config, args.account, config.get("proxy")):
+                        merge_into_config({key: cookie_fields(accounts[args.account])})
                 else:
                     print(f"账号 {args.account} 不存在")
         else:
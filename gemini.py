@@ -5,6 +5,7 @@
 """
 
 import json
+import logging
 import time
 import hmac
 import hashlib
@@ -107,6 +108,8 @@ def set_log_level(level: str, persist: bool = False):
         raise ValueError(f"无效日志级别: {level}")
     CURRENT_LOG_LEVEL_NAME = lvl
     CURRENT_LOG_LEVEL = LOG_LEVELS[lvl]
+    # cookie_refresh 使用标准 logging，级别数值与 LOG_LEVELS 一致
+    logging.getLogger("cookie_refresh").setLevel(CURRENT_LOG_LEVEL)
     if persist and globals().get("account_manager") and account_manager.config is not None:
         account_manager.config["log_level"] = lvl
         account_manager.save_config()
@@ -2190,7 +2193,13 @@ def delete_account(account_id):
     if account_id < 0 or account_id >= len(account_manager.accounts):
         return jsonify({"error": "账号不存在"}), 404
     
-    account_manager.accounts.pop(account_id)
+    removed = account_manager.accounts.pop(account_id)
+    # 删除该账号保存的浏览器登录状态
+    try:
+        from cookie_refresh import remove_storage_state
+        remove_storage_state(removed)
+    except ImportError:
+        pass
     # 重建状态映射
     new_states = {}
     for i in range(len(account_manager.accounts)):
@@ -2267,7 +2276,11 @@ def auto_refresh_account_cookie(account_id):
         return jsonify({"error": "账号不存在"}), 404
     
     try:
-        from cookie_refresh import refresh_account_cookie, PLAYWRIGHT_AVAILABLE, check_playwright_browser
+        from cookie_refresh import (
+            refresh_account_cookie, setup_logging, account_key, cookie_fields, apply_cookie_fields,
+            PLAYWRIGHT_AVAILABLE, check_playwright_browser,
+        )
+        setup_logging(CURRENT_LOG_LEVEL_NAME)
         
         if not PLAYWRIGHT_AVAILABLE:
             return jsonify({"success": False, "error": "Playwright未安装，无法自动刷新Cookie。请先运行: pip install playwright && playwright install chromium"}), 400
@@ -2275,14 +2288,27 @@ def auto_refresh_account_cookie(account_id):
         if not check_playwright_browser():
             return jsonify({"success": False, "error": "Playwright浏览器未安装。请运行: playwright install chromium"}), 400
         
-        account = account_manager.accounts[account_id]
-        proxy = account_manager.config.get("proxy")
+        # 浏览器刷新耗时较长，只在副本上进行，不占用账号锁
+        with account_manager.lock:
+            if account_id >= len(account_manager.accounts):
+                return jsonify({"error": "账号不存在"}), 404
+            accounts = list(account_manager.accounts)
+            accounts[account_id] = dict(accounts[account_id])
+            key = account_key(accounts[account_id])
+            proxy = account_manager.config.get("proxy")
         
-        success = refresh_account_cookie(account_id, account, proxy)
+        success = refresh_account_cookie({"accounts": accounts}, account_id, proxy)
         
         if success:
-            # 重新加载配置以获取更新后的Cookie
-            account_manager.load_config()
+            # 持锁只做字段回写和保存；刷新期间账号被删除或移动则放弃
+            with account_manager.lock:
+                current = account_manager.accounts
+                if account_id >= len(current) or account_key(current[account_id]) != key:
+                    return jsonify({"success": False, "error": "刷新期间账号已变更，请重试"}), 409
+                apply_cookie_fields(current[account_id], cookie_fields(accounts[account_id]))
+                account_manager.config["accounts"] = current
+                account_manager.save_config()
+            
             # 清除JWT缓存
             state = account_manager.account_states.get(account_id, {})
             state["jwt"] = None
@@ -2669,7 +2695,8 @@ if __name__ == '__main__':
     
     # 启动Cookie自动刷新线程
     try:
-        from cookie_refresh import start_cookie_refresh_thread
+        from cookie_refresh import start_cookie_refresh_thread, setup_logging
+        setup_logging(CURRENT_LOG_LEVEL_NAME)
         cookie_thread = start_cookie_refresh_thread()
         if cookie_thread:
             print("[Cookie刷新] 后台线程已启动")